@@ -0,0 +1,44 @@
+"""
+Ürün bazlı uyarlamalı kontrol için stok geçmişi alanları
+
+Revision ID: 0001_item_stock_history
+Revises:
+Create Date: 2026-10-17
+
+create_all ile yeni oluşturulan veritabanlarında alanlar zaten bulunur;
+migration yalnızca eksik olanları ekler.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0001_item_stock_history"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _columns(table):
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table):
+        return None
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade():
+    columns = _columns("wishlist_items")
+    if columns is None:
+        return
+    if "stock_change_count" not in columns:
+        op.add_column(
+            "wishlist_items",
+            sa.Column("stock_change_count", sa.Integer(), nullable=False, server_default="0")
+        )
+    if "last_stock_change_at" not in columns:
+        op.add_column("wishlist_items", sa.Column("last_stock_change_at", sa.DateTime(timezone=True)))
+
+
+def downgrade():
+    with op.batch_alter_table("wishlist_items") as batch_op:
+        batch_op.drop_column("last_stock_change_at")
+        batch_op.drop_column("stock_change_count")
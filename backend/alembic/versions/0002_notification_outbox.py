@@ -0,0 +1,48 @@
+"""
+Bildirim outbox alanları
+
+Revision ID: 0002_notification_outbox
+Revises: 0001_item_stock_history
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0002_notification_outbox"
+down_revision = "0001_item_stock_history"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("notifications"):
+        return
+    columns = {column["name"] for column in inspector.get_columns("notifications")}
+    if "attempts" not in columns:
+        op.add_column(
+            "notifications",
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0")
+        )
+    if "next_attempt_at" not in columns:
+        op.add_column("notifications", sa.Column("next_attempt_at", sa.DateTime(timezone=True)))
+    if "locked_until" not in columns:
+        op.add_column("notifications", sa.Column("locked_until", sa.DateTime(timezone=True)))
+    if "last_error" not in columns:
+        op.add_column("notifications", sa.Column("last_error", sa.Text()))
+
+    indexes = {index["name"] for index in inspector.get_indexes("notifications")}
+    if "ix_notifications_outbox" not in indexes:
+        op.create_index(
+            "ix_notifications_outbox", "notifications", ["is_sent", "next_attempt_at", "id"]
+        )
+
+
+def downgrade():
+    op.drop_index("ix_notifications_outbox", table_name="notifications")
+    with op.batch_alter_table("notifications") as batch_op:
+        batch_op.drop_column("last_error")
+        batch_op.drop_column("locked_until")
+        batch_op.drop_column("next_attempt_at")
+        batch_op.drop_column("attempts")
@@ -0,0 +1,40 @@
+"""
+Wishlist sahibi ve cihaz token indeksi
+
+Revision ID: 0003_wishlist_owner
+Revises: 0002_notification_outbox
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0003_wishlist_owner"
+down_revision = "0002_notification_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("wishlists"):
+        columns = {column["name"] for column in inspector.get_columns("wishlists")}
+        if "user_id" not in columns:
+            # SQLite'ta kısıt eklemek için tablo batch modunda yeniden oluşturulur
+            with op.batch_alter_table("wishlists") as batch_op:
+                batch_op.add_column(sa.Column("user_id", sa.Integer()))
+                batch_op.create_foreign_key("fk_wishlists_user_id_users", "users", ["user_id"], ["id"])
+                batch_op.create_index("ix_wishlists_user_id", ["user_id"])
+
+    if inspector.has_table("users"):
+        indexes = {index["name"] for index in inspector.get_indexes("users")}
+        if "ix_users_fcm_token" not in indexes:
+            op.create_index("ix_users_fcm_token", "users", ["fcm_token"])
+
+
+def downgrade():
+    op.drop_index("ix_users_fcm_token", table_name="users")
+    with op.batch_alter_table("wishlists") as batch_op:
+        batch_op.drop_index("ix_wishlists_user_id")
+        batch_op.drop_constraint("fk_wishlists_user_id_users", type_="foreignkey")
+        batch_op.drop_column("user_id")
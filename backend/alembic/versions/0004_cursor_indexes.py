@@ -0,0 +1,36 @@
+"""
+Cursor sayfalaması ve temizlik indeksleri
+
+Revision ID: 0004_cursor_indexes
+Revises: 0003_wishlist_owner
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "0004_cursor_indexes"
+down_revision = "0003_wishlist_owner"
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ("ix_notifications_created_at_id", "notifications", ["created_at", "id"]),
+    ("ix_products_store_name_id", "products", ["store_name", "id"]),
+    ("ix_products_is_in_stock_id", "products", ["is_in_stock", "id"]),
+    ("ix_wishlist_items_wishlist_id_id", "wishlist_items", ["wishlist_id", "id"]),
+)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in INDEXES:
+        if not inspector.has_table(table):
+            continue
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
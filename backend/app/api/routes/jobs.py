@@ -0,0 +1,35 @@
+"""
+Arka plan işi API route'ları
+"""
+import asyncio
+
+from celery.result import AsyncResult
+from fastapi import APIRouter
+
+from app.core.schemas import JobStatusResponse
+from app.tasks.celery_app import celery_app
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Wishlist içe aktarma/yenileme işinin durumunu getirir"""
+    result = AsyncResult(job_id, app=celery_app)
+    # Sonuç backend'i (Redis) senkron okunur, event loop'u bloklamaması için thread'de
+    state, info = await asyncio.to_thread(lambda: (result.state, result.info))
+    job = JobStatusResponse(job_id=job_id, status=state)
+    
+    if state == "FAILURE":
+        job.stage = "failed"
+        job.error = str(info)
+    elif isinstance(info, dict):
+        # PROGRESS meta'sı veya görevin dönüş değeri
+        job.stage = info.get("stage")
+        job.wishlist_id = info.get("wishlist_id")
+        job.counts = info.get("counts")
+        job.error = info.get("error")
+        if job.stage == "failed":
+            job.status = "FAILURE"
+    
+    return job
@@ -1,46 +1,58 @@
 """
 Notifications API route'ları
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.schemas import NotificationResponse, APIResponse
+from app.core.database import get_async_db
+from app.core.pagination import decode_cursor, paginate
+from app.core.schemas import CursorPage, NotificationResponse, APIResponse
 from app.models.notification import Notification
 from app.services.notification_service import notification_service
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[NotificationResponse])
+@router.get("/", response_model=CursorPage[NotificationResponse])
 async def get_notifications(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
     is_sent: bool = None,
     notification_type: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Tüm bildirimleri getirir"""
-    query = db.query(Notification)
+    """
+    Tüm bildirimleri yeniden eskiye getirir
+
+    Sayfalama id üzerinde cursor ile yapılır (id ekleme sırasıyla artar);
+    sonraki sayfa için dönen next_cursor gönderilir.
+    """
+    query = select(Notification)
     
     if is_sent is not None:
-        query = query.filter(Notification.is_sent == is_sent)
+        query = query.where(Notification.is_sent == is_sent)
     
     if notification_type:
-        query = query.filter(Notification.notification_type == notification_type)
+        query = query.where(Notification.notification_type == notification_type)
+    
+    if cursor:
+        last_id, = decode_cursor(cursor, int)
+        query = query.where(Notification.id < last_id)
     
-    notifications = query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
-    return notifications
+    result = await db.execute(query.order_by(Notification.id.desc()).limit(limit + 1))
+    items, next_cursor = paginate(result.scalars().all(), limit, lambda notification: (notification.id,))
+    return CursorPage[NotificationResponse](items=items, next_cursor=next_cursor)
 
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
 async def get_notification(
     notification_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Belirli bir bildirimi getirir"""
-    notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    notification = await db.get(Notification, notification_id)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -52,7 +64,7 @@ async def get_notification(
 @router.post("/test", response_model=APIResponse)
 async def send_test_notification(
     fcm_token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test bildirimi gönderir"""
     try:
@@ -78,18 +90,18 @@ async def send_test_notification(
 @router.delete("/{notification_id}", response_model=APIResponse)
 async def delete_notification(
     notification_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Bildirimi siler"""
-    notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    notification = await db.get(Notification, notification_id)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
     
-    db.delete(notification)
-    db.commit()
+    await db.delete(notification)
+    await db.commit()
     
     return APIResponse(
         success=True,
@@ -99,19 +111,20 @@ async def delete_notification(
 
 @router.delete("/", response_model=APIResponse)
 async def clear_all_notifications(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Tüm bildirimleri temizler"""
     try:
-        deleted_count = db.query(Notification).delete()
-        db.commit()
+        result = await db.execute(delete(Notification))
+        deleted_count = result.rowcount
+        await db.commit()
         
         return APIResponse(
             success=True,
             message=f"Deleted {deleted_count} notifications"
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error clearing notifications: {str(e)}"
@@ -1,47 +1,86 @@
 """
 Products API route'ları
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.schemas import ProductResponse, APIResponse
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import decode_cursor, paginate
+from app.core.schemas import CursorPage, ProductResponse, APIResponse
 from app.models.product import Product
-from app.services.scraper_service import scraper_service
+from app.services.stock_checker import StockCheckerBusy, stock_checker
 from app.tasks.stock_tasks import check_single_product_stock
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[ProductResponse])
-async def get_products(
-    skip: int = 0,
-    limit: int = 100,
-    store_name: str = None,
-    in_stock: bool = None,
-    db: Session = Depends(get_db)
-):
-    """Tüm ürünleri getirir"""
-    query = db.query(Product)
+async def _get_product_page(
+    db: AsyncSession,
+    cursor: Optional[str],
+    limit: int,
+    store_name: Optional[str] = None,
+    in_stock: Optional[bool] = None
+) -> CursorPage[ProductResponse]:
+    """Ürünleri id sırasıyla cursor sayfalamasıyla getirir"""
+    query = select(Product)
     
     if store_name:
-        query = query.filter(Product.store_name == store_name)
+        query = query.where(Product.store_name == store_name)
     
     if in_stock is not None:
-        query = query.filter(Product.is_in_stock == in_stock)
+        query = query.where(Product.is_in_stock == in_stock)
     
-    products = query.offset(skip).limit(limit).all()
-    return products
+    if cursor:
+        last_id, = decode_cursor(cursor, int)
+        query = query.where(Product.id > last_id)
+    
+    result = await db.execute(query.order_by(Product.id).limit(limit + 1))
+    items, next_cursor = paginate(result.scalars().all(), limit, lambda product: (product.id,))
+    return CursorPage[ProductResponse](items=items, next_cursor=next_cursor)
+
+
+@router.get("/", response_model=CursorPage[ProductResponse])
+async def get_products(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    store_name: str = None,
+    in_stock: bool = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Tüm ürünleri getirir"""
+    return await _get_product_page(db, cursor, limit, store_name=store_name, in_stock=in_stock)
+
+
+@router.get("/in-stock", response_model=CursorPage[ProductResponse])
+async def get_in_stock_products(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stokta olan ürünleri getirir"""
+    return await _get_product_page(db, cursor, limit, in_stock=True)
+
+
+@router.get("/out-of-stock", response_model=CursorPage[ProductResponse])
+async def get_out_of_stock_products(
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stokta olmayan ürünleri getirir"""
+    return await _get_product_page(db, cursor, limit, in_stock=False)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Belirli bir ürünü getirir"""
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,45 +93,36 @@ async def get_product(
 async def check_product_stock(
     product_url: str,
     store_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Ürün stok durumunu kontrol eder"""
+    """
+    Ürün stok durumunu kontrol eder
+
+    Aynı ürün için eşzamanlı istekler tek kontrolü paylaşır ve sonuç kısa süre
+    önbellekte tutulur. Kontrol havuzu doluysa 503 döner.
+    """
+    if store_name not in settings.SUPPORTED_STORES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported store: {store_name}"
+        )
+    
     try:
-        stock_info = await scraper_service.check_product_stock(product_url, store_name)
+        stock_info = await stock_checker.check_product_on_demand(store_name, product_url)
         
         return APIResponse(
             success=True,
             message="Stock check completed",
             data=stock_info
         )
+    except StockCheckerBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(settings.HTTP_TIMEOUT)}
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error checking stock: {str(e)}"
-        )
-
-
-@router.get("/in-stock", response_model=List[ProductResponse])
-async def get_in_stock_products(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
-    """Stokta olan ürünleri getirir"""
-    products = db.query(Product).filter(
-        Product.is_in_stock == True
-    ).offset(skip).limit(limit).all()
-    return products
-
-
-@router.get("/out-of-stock", response_model=List[ProductResponse])
-async def get_out_of_stock_products(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
-):
-    """Stokta olmayan ürünleri getirir"""
-    products = db.query(Product).filter(
-        Product.is_in_stock == False
-    ).offset(skip).limit(limit).all()
-    return products 
\ No newline at end of file
+        )
\ No newline at end of file
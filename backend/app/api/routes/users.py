@@ -0,0 +1,60 @@
+"""
+Kullanıcı API route'ları
+"""
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_async_db
+from app.core.schemas import FCMTokenUpdate, UserResponse
+from app.models.user import User
+from app.models.wishlist import Wishlist
+from app.services.token_index import token_index
+
+router = APIRouter()
+
+
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Belirli bir kullanıcıyı getirir"""
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    return user
+
+
+@router.put("/{user_id}/fcm-token", response_model=UserResponse)
+async def update_fcm_token(
+    user_id: int,
+    token_update: FCMTokenUpdate,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Kullanıcının bildirim alacağı cihaz token'ını kaydeder veya siler
+
+    Kullanıcının wishlist'lerinin önbellekteki alıcı token'ları geçersiz
+    kılınır; sonraki bildirimler yeni token'a gider.
+    """
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    user.fcm_token = token_update.fcm_token
+    await db.commit()
+    await db.refresh(user)
+
+    wishlist_ids = await db.scalars(select(Wishlist.id).where(Wishlist.user_id == user_id))
+    await asyncio.to_thread(token_index.invalidate, wishlist_ids.all())
+
+    return user
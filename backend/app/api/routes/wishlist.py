@@ -1,96 +1,162 @@
 """
 Wishlist API route'ları
 """
+import asyncio
+import uuid
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.pagination import decode_cursor, paginate
 from app.core.schemas import (
+    CursorPage,
     WishlistCreate, 
     WishlistUpdate, 
     WishlistResponse,
     WishlistItemCreate,
     WishlistItemResponse,
+    WishlistJobResponse,
     APIResponse
 )
+from app.models.user import User
 from app.models.wishlist import Wishlist, WishlistItem
-from app.services.scraper_service import scraper_service
+from app.services.check_scheduler import check_scheduler
+from app.services.lease_lock import wishlist_lock
+from app.services.token_index import token_index
 from app.tasks.stock_tasks import check_wishlist_stock
 
 router = APIRouter()
 
 
-@router.post("/", response_model=WishlistResponse)
+async def _load_wishlist(db: AsyncSession, wishlist_id: int) -> Optional[Wishlist]:
+    """Wishlist'i ürünleriyle birlikte yükler (async session'da lazy load yapılamaz)"""
+    result = await db.execute(
+        select(Wishlist)
+        .options(selectinload(Wishlist.items))
+        .where(Wishlist.id == wishlist_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _ensure_user(db: AsyncSession, user_id: Optional[int]):
+    """Wishlist'e bağlanacak kullanıcının var olduğunu doğrular"""
+    if user_id is not None and not await db.get(User, user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+
+@router.post("/", response_model=WishlistJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_wishlist(
     wishlist: WishlistCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Yeni wishlist oluşturur"""
+    """
+    Yeni wishlist oluşturur
+
+    Ürünler istek içinde çekilmez; ilk içe aktarma scrape kuyruğunda çalışır
+    ve durumu dönen job_id ile /api/v1/jobs/{job_id} üzerinden izlenir.
+    """
+    await _ensure_user(db, wishlist.user_id)
     try:
         # Wishlist oluştur
         db_wishlist = Wishlist(
             name=wishlist.name,
             store_name=wishlist.store_name,
             url=str(wishlist.url),
-            auto_purchase=wishlist.auto_purchase
+            auto_purchase=wishlist.auto_purchase,
+            user_id=wishlist.user_id
         )
         db.add(db_wishlist)
-        db.commit()
-        db.refresh(db_wishlist)
-        
-        # Wishlist'ten ürünleri çek
-        products = await scraper_service.scrape_wishlist(
-            wishlist.store_name, 
-            str(wishlist.url)
-        )
-        
-        # Ürünleri veritabanına ekle
-        for product_data in products:
-            wishlist_item = WishlistItem(
-                wishlist_id=db_wishlist.id,
-                product_id=product_data["product_id"],
-                product_name=product_data["product_name"],
-                product_url=product_data["product_url"],
-                product_image=product_data["product_image"],
-                price=product_data["price"],
-                size=product_data["size"],
-                color=product_data["color"],
-                is_in_stock=product_data["is_in_stock"]
-            )
-            db.add(wishlist_item)
-        
-        db.commit()
-        db.refresh(db_wishlist)
-        
-        return db_wishlist
-        
+        await db.commit()
+        await db.refresh(db_wishlist)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating wishlist: {str(e)}"
         )
+    
+    # İlk içe aktarmayı arka planda başlat (Redis ve broker çağrıları event loop'u bloklamasın)
+    job_id = uuid.uuid4().hex
+    await asyncio.to_thread(
+        wishlist_lock.acquire, str(db_wishlist.id), job_id, settings.WISHLIST_LOCK_TTL
+    )
+    try:
+        await asyncio.to_thread(check_wishlist_stock.apply_async, (db_wishlist.id,), task_id=job_id)
+    except Exception as e:
+        await asyncio.to_thread(wishlist_lock.release, str(db_wishlist.id), job_id)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error starting wishlist import: {str(e)}"
+        )
+    
+    return WishlistJobResponse(job_id=job_id, wishlist_id=db_wishlist.id)
 
 
 @router.get("/", response_model=List[WishlistResponse])
 async def get_wishlists(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    include_items: bool = True,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Tüm wishlist'leri getirir"""
-    wishlists = db.query(Wishlist).offset(skip).limit(limit).all()
-    return wishlists
+    """
+    Tüm wishlist'leri getirir
+
+    include_items=false ile ürün listeleri yerine yalnızca toplam ve stokta
+    olan ürün sayıları tek sorguda döner; ürünler /{wishlist_id}/items
+    üzerinden sayfalı olarak alınır.
+    """
+    if include_items:
+        # Ürünler tek bir ek sorguda toplu yüklenir (N+1 yok)
+        result = await db.execute(
+            select(Wishlist)
+            .options(selectinload(Wishlist.items))
+            .order_by(Wishlist.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        wishlists = []
+        for wishlist in result.scalars():
+            response = WishlistResponse.model_validate(wishlist)
+            response.item_count = len(wishlist.items)
+            response.in_stock_count = sum(1 for item in wishlist.items if item.is_in_stock)
+            wishlists.append(response)
+        return wishlists
+    
+    in_stock = func.coalesce(func.sum(case((WishlistItem.is_in_stock == True, 1), else_=0)), 0)
+    result = await db.execute(
+        select(Wishlist, func.count(WishlistItem.id), in_stock)
+        .outerjoin(WishlistItem, WishlistItem.wishlist_id == Wishlist.id)
+        .group_by(Wishlist.id)
+        .order_by(Wishlist.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return [
+        WishlistResponse(
+            **{column.key: getattr(wishlist, column.key) for column in Wishlist.__table__.columns},
+            item_count=item_count,
+            in_stock_count=in_stock_count
+        )
+        for wishlist, item_count, in_stock_count in result
+    ]
 
 
 @router.get("/{wishlist_id}", response_model=WishlistResponse)
 async def get_wishlist(
     wishlist_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Belirli bir wishlist'i getirir"""
-    wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_id).first()
+    wishlist = await _load_wishlist(db, wishlist_id)
     if not wishlist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -103,10 +169,10 @@ async def get_wishlist(
 async def update_wishlist(
     wishlist_id: int,
     wishlist_update: WishlistUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Wishlist'i günceller"""
-    wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_id).first()
+    wishlist = await _load_wishlist(db, wishlist_id)
     if not wishlist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -115,29 +181,34 @@ async def update_wishlist(
     
     # Güncelleme verilerini uygula
     update_data = wishlist_update.dict(exclude_unset=True)
+    if "user_id" in update_data:
+        await _ensure_user(db, update_data["user_id"])
     for field, value in update_data.items():
         setattr(wishlist, field, value)
     
-    db.commit()
-    db.refresh(wishlist)
-    return wishlist
+    await db.commit()
+    if "user_id" in update_data:
+        # Bildirimler yeni sahibin cihazlarına gitsin
+        await asyncio.to_thread(token_index.invalidate, [wishlist_id])
+    return await _load_wishlist(db, wishlist_id)
 
 
 @router.delete("/{wishlist_id}", response_model=APIResponse)
 async def delete_wishlist(
     wishlist_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Wishlist'i siler"""
-    wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_id).first()
+    wishlist = await db.get(Wishlist, wishlist_id)
     if not wishlist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wishlist not found"
         )
     
-    db.delete(wishlist)
-    db.commit()
+    await db.delete(wishlist)
+    await db.commit()
+    await asyncio.to_thread(token_index.invalidate, [wishlist_id])
     
     return APIResponse(
         success=True,
@@ -148,32 +219,57 @@ async def delete_wishlist(
 @router.post("/{wishlist_id}/refresh", response_model=APIResponse)
 async def refresh_wishlist(
     wishlist_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Wishlist'i yeniler (ürünleri tekrar çeker)"""
-    wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_id).first()
+    """
+    Wishlist'i yeniler (ürünleri tekrar çeker)
+
+    Wishlist için zaten çalışan bir kontrol varsa yenisi başlatılmaz,
+    çalışan işin id'si döndürülür.
+    """
+    wishlist = await db.get(Wishlist, wishlist_id)
     if not wishlist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Wishlist not found"
         )
     
-    # Celery task'ı başlat
-    check_wishlist_stock.delay(wishlist_id)
+    # Kilidi görev id'si adına ayır; görev başladığında aynı kilidi devralır
+    job_id = uuid.uuid4().hex
+    acquired, holder = await asyncio.to_thread(
+        wishlist_lock.acquire, str(wishlist_id), job_id, settings.WISHLIST_LOCK_TTL
+    )
+    if not acquired:
+        return APIResponse(
+            success=True,
+            message="Wishlist refresh already in progress",
+            data={"job_id": holder}
+        )
+    
+    # Celery task'ı interaktif kuyrukta başlat (zamanlanmış kontrollerin arkasında beklemez)
+    try:
+        await asyncio.to_thread(
+            check_wishlist_stock.apply_async,
+            (wishlist_id,), task_id=job_id, queue="interactive", priority=0
+        )
+    except Exception:
+        await asyncio.to_thread(wishlist_lock.release, str(wishlist_id), job_id)
+        raise
     
     return APIResponse(
         success=True,
-        message="Wishlist refresh started"
+        message="Wishlist refresh started",
+        data={"job_id": job_id}
     )
 
 
 @router.post("/{wishlist_id}/toggle-auto-purchase", response_model=WishlistResponse)
 async def toggle_auto_purchase(
     wishlist_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Otomatik satın alma özelliğini açıp kapatır"""
-    wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_id).first()
+    wishlist = await _load_wishlist(db, wishlist_id)
     if not wishlist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -181,34 +277,37 @@ async def toggle_auto_purchase(
         )
     
     wishlist.auto_purchase = not wishlist.auto_purchase
-    db.commit()
-    db.refresh(wishlist)
+    await db.commit()
     
-    return wishlist
+    return await _load_wishlist(db, wishlist_id)
 
 
-@router.get("/{wishlist_id}/items", response_model=List[WishlistItemResponse])
+@router.get("/{wishlist_id}/items", response_model=CursorPage[WishlistItemResponse])
 async def get_wishlist_items(
     wishlist_id: int,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Wishlist'teki ürünleri getirir"""
-    items = db.query(WishlistItem).filter(
-        WishlistItem.wishlist_id == wishlist_id
-    ).offset(skip).limit(limit).all()
-    return items
+    """Wishlist'teki ürünleri id sırasıyla cursor sayfalamasıyla getirir"""
+    query = select(WishlistItem).where(WishlistItem.wishlist_id == wishlist_id)
+    if cursor:
+        last_id, = decode_cursor(cursor, int)
+        query = query.where(WishlistItem.id > last_id)
+    
+    result = await db.execute(query.order_by(WishlistItem.id).limit(limit + 1))
+    items, next_cursor = paginate(result.scalars().all(), limit, lambda item: (item.id,))
+    return CursorPage[WishlistItemResponse](items=items, next_cursor=next_cursor)
 
 
 @router.post("/{wishlist_id}/items", response_model=WishlistItemResponse)
 async def add_wishlist_item(
     wishlist_id: int,
     item: WishlistItemCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Wishlist'e yeni ürün ekler"""
-    wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_id).first()
+    wishlist = await db.get(Wishlist, wishlist_id)
     if not wishlist:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -227,8 +326,9 @@ async def add_wishlist_item(
     )
     
     db.add(wishlist_item)
-    db.commit()
-    db.refresh(wishlist_item)
+    await db.commit()
+    await db.refresh(wishlist_item)
+    await asyncio.to_thread(check_scheduler.seed, [wishlist_item.id])
     
     return wishlist_item
 
@@ -237,13 +337,15 @@ async def add_wishlist_item(
 async def remove_wishlist_item(
     wishlist_id: int,
     item_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Wishlist'ten ürün çıkarır"""
-    item = db.query(WishlistItem).filter(
-        WishlistItem.id == item_id,
-        WishlistItem.wishlist_id == wishlist_id
-    ).first()
+    item = await db.scalar(
+        select(WishlistItem).where(
+            WishlistItem.id == item_id,
+            WishlistItem.wishlist_id == wishlist_id
+        )
+    )
     
     if not item:
         raise HTTPException(
@@ -251,8 +353,8 @@ async def remove_wishlist_item(
             detail="Wishlist item not found"
         )
     
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
     
     return APIResponse(
         success=True,
@@ -2,7 +2,7 @@
 Uygulama konfigürasyon ayarları
 """
 from pydantic_settings import BaseSettings
-from typing import Optional, Dict, Any, ClassVar
+from typing import Optional, Dict, Any, ClassVar, List
 import os
 
 
@@ -23,6 +23,8 @@ class Settings(BaseSettings):
     # Firebase (Bildirimler için)
     FIREBASE_CREDENTIALS_PATH: Optional[str] = None
     FIREBASE_PROJECT_ID: Optional[str] = None
+    FCM_SERVER_KEY: Optional[str] = None  # Legacy FCM HTTP API sunucu anahtarı
+    FCM_MAX_WORKERS: int = 8  # eşzamanlı FCM isteği sayısı
     
     # API
     API_V1_STR: str = "/api/v1"
@@ -32,31 +34,133 @@ class Settings(BaseSettings):
     # Web Scraping
     SCRAPING_DELAY: int = 2  # saniye
     MAX_RETRIES: int = 3
+    HTTP_TIMEOUT: int = 10  # saniye
+    PAGE_CACHE_TTL: int = 7 * 24 * 60 * 60  # saniye, ETag/içerik hash'lerinin saklanma süresi
     USER_AGENT: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
     
+    # Tarayıcı havuzu
+    BROWSER_POOL_SIZE: int = 2  # worker süreci başına en fazla Chrome sayısı
+    BROWSER_MAX_PAGES: int = 50  # bu kadar sayfadan sonra tarayıcı yenilenir
+    BROWSER_MAX_RSS_MB: int = 1024  # bu bellek kullanımının üstünde tarayıcı yenilenir
+    BROWSER_CHECKOUT_TIMEOUT: int = 60  # saniye
+    BROWSER_PAGE_LOAD_TIMEOUT: int = 30  # saniye
+    BROWSER_RENDER_TIMEOUT: int = 10  # ürün seçicisinin DOM'a gelmesi için beklenecek süre
+    # Tarayıcıda indirilmeyecek kaynaklar (görsel, font, stil, video ve takip script'leri)
+    BROWSER_BLOCKED_URLS: List[str] = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.css",
+        "*.mp4", "*.webm", "*.m3u8",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*facebook.net*", "*hotjar.com*", "*criteo.com*", "*tiktok.com*",
+    ]
+    
+    # Eşzamanlı kontrol sınırları
+    MAX_CONCURRENT_CHECKS: int = 10  # süreç başına aynı anda çalışan kontrol sayısı
+    STORE_CONCURRENCY: int = 3  # mağaza başına varsayılan sınır (max_concurrency ile ezilebilir)
+    ON_DEMAND_CHECK_CONCURRENCY: int = 2  # /products/check-stock için API süreci başına eşzamanlı kontrol
+    ON_DEMAND_CHECK_QUEUE: int = 8  # havuz doluyken bekleyebilecek istek sayısı, fazlası 503 alır
+    ON_DEMAND_CACHE_TTL: int = 60  # saniye, anlık kontrol sonuçlarının paylaşıldığı süre
+    
+    # Hız sınırlama (mağaza başına token bucket, rate_per_second/burst ile ezilebilir)
+    RATE_LIMIT_BURST: int = 3
+    RATE_LIMIT_MAX_PENALTY: int = 16  # 429/503 sonrası en fazla yavaşlama katsayısı
+    RATE_LIMIT_PENALTY_TTL: int = 600  # saniye, yavaşlamanın sürdüğü süre
+    
     # Stok kontrolü
-    STOCK_CHECK_INTERVAL: int = 30  # dakika
+    STOCK_CHECK_INTERVAL: int = 30  # dakika, ürün kontrol aralığının başlangıç değeri
+    PRODUCT_SHARE_TTL: int = 60  # saniye, aynı URL'in zamanlanmış kontrollerinin tek sonucu paylaştığı süre
+    WISHLIST_SYNC_INTERVAL: int = 6 * 60  # dakika, wishlist'lerin eklenen/silinen ürünler için taranma sıklığı
+    WISHLIST_LOCK_TTL: int = 15 * 60  # saniye, wishlist kontrol kilidinin kira süresi
+    WISHLIST_WRITE_LOCK_TTL: int = 60  # saniye, stok sonuçları yazılırken tutulan yazma kilidinin kira süresi
+    DISPATCH_CHUNK_SIZE: int = 500  # check_all_wishlists'in tek grupta kuyruğa aldığı görev sayısı
     NOTIFICATION_COOLDOWN: int = 60  # dakika
+    NOTIFICATION_BATCH_SIZE: int = 500  # dispatcher'ın tek seferde aldığı bildirim sayısı
+    NOTIFICATION_MAX_ATTEMPTS: int = 5  # bu kadar başarısız denemeden sonra bildirim bırakılır
+    NOTIFICATION_RETRY_DELAY: int = 30  # saniye, üstel geri çekilmenin başlangıcı
+    NOTIFICATION_LEASE: int = 120  # saniye, dispatcher'ın aldığı bildirimleri tutma süresi
+    NOTIFICATION_COALESCE_WINDOW: int = 30  # saniye, aynı wishlist'in bildirimlerinin birleştirildiği süre
+    NOTIFICATION_DISPATCH_INTERVAL: int = 30  # saniye, bekleyen bildirimlerin taranma sıklığı
+    TOKEN_INDEX_TTL: int = 60 * 60  # saniye, wishlist → cihaz token'ları önbelleğinin süresi
+    HEARTBEAT_FLUSH_INTERVAL: int = 60  # saniye, tamponlanan last_checked zamanlarının yazılma sıklığı
+    
+    # Ürün bazlı uyarlamalı kontrol zamanlaması
+    CHECK_INTERVAL_MIN: int = 5  # dakika, sık değişen ürünler için alt sınır
+    CHECK_INTERVAL_MAX: int = 6 * 60  # dakika, hiç değişmeyen ürünler için üst sınır
+    CHECK_DISPATCH_BATCH: int = 500  # dakikada en fazla kuyruğa alınacak ürün kontrolü
+    CHECK_BATCH_SIZE: int = 20  # tek görevde (tek event loop'ta) birlikte kontrol edilen ürün sayısı
+    CHECK_CLAIM_TIMEOUT: int = 15 * 60  # saniye, tamamlanmayan kontrol bu süre sonra tekrar denenir
+    SCHEDULE_TIMEZONE: str = "Europe/Istanbul"
+    QUIET_HOURS: List[int] = [1, 2, 3, 4, 5, 6]  # yerel saat, stok yenilemesinin nadir olduğu saatler
+    QUIET_HOURS_FACTOR: float = 3.0  # sessiz saatlerde aralık çarpanı
     
     # Mağaza ayarları
-    SUPPORTED_STORES: ClassVar[Dict[str, Dict[str, str]]] = {
+    # requires_render: True ise HTTP hızlı yolu atlanır ve doğrudan Selenium kullanılır
+    # fields: wishlist kartındaki alanlar; "seçici" metni, "seçici@attr" niteliği,
+    #         "@attr" kartın kendi niteliğini okur
+    # check_interval_factor: ürün kontrol aralığı çarpanı (sık yenilenen mağazalar için < 1)
+    SUPPORTED_STORES: ClassVar[Dict[str, Dict[str, Any]]] = {
         "zara": {
             "base_url": "https://www.zara.com",
             "wishlist_url": "https://www.zara.com/tr/tr/wishlist",
             "product_selector": ".product-item",
-            "stock_selector": ".product-availability"
+            "stock_selector": ".product-availability",
+            "size_selector": ".size-selector .size",
+            "price_selector": ".price",
+            "in_stock_keywords": ["stokta"],
+            "out_of_stock_keywords": ["stokta yok", "tükendi"],
+            "fields": {
+                "product_id": "@data-product-id",
+                "product_name": ".product-name",
+                "product_url": "a[href]@href",
+                "product_image": "img@src",
+                "price": ".price"
+            },
+            "requires_render": False,
+            "rate_per_second": 0.5,
+            "burst": 3,
+            "check_interval_factor": 1.0
         },
         "bershka": {
             "base_url": "https://www.bershka.com",
             "wishlist_url": "https://www.bershka.com/tr/wishlist",
             "product_selector": ".product-item",
-            "stock_selector": ".product-availability"
+            "stock_selector": ".product-availability",
+            "size_selector": ".size-selector .size",
+            "price_selector": ".price",
+            "in_stock_keywords": ["stokta"],
+            "out_of_stock_keywords": ["stokta yok", "tükendi"],
+            "fields": {
+                "product_id": "@data-product-id",
+                "product_name": ".product-name",
+                "product_url": "a[href]@href",
+                "product_image": "img@src",
+                "price": ".price"
+            },
+            "requires_render": False,
+            "rate_per_second": 0.5,
+            "burst": 3,
+            "check_interval_factor": 1.0
         },
         "pullandbear": {
             "base_url": "https://www.pullandbear.com",
             "wishlist_url": "https://www.pullandbear.com/tr/wishlist",
             "product_selector": ".product-item",
-            "stock_selector": ".product-availability"
+            "stock_selector": ".product-availability",
+            "size_selector": ".size-selector .size",
+            "price_selector": ".price",
+            "in_stock_keywords": ["stokta"],
+            "out_of_stock_keywords": ["stokta yok", "tükendi"],
+            "fields": {
+                "product_id": "@data-product-id",
+                "product_name": ".product-name",
+                "product_url": "a[href]@href",
+                "product_image": "img@src",
+                "price": ".price"
+            },
+            "requires_render": False,
+            "rate_per_second": 0.5,
+            "burst": 3,
+            "check_interval_factor": 1.0
         }
     }
     
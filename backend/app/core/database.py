@@ -2,6 +2,7 @@
 Veritabanı konfigürasyonu ve bağlantı yönetimi
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -22,9 +23,35 @@ else:
         echo=settings.DEBUG
     )
 
-# Session factory
+# Session factory (Celery görevleri ve betikler için senkron)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> str:
+    """Senkron veritabanı URL'ini asenkron sürücülü karşılığına çevir"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+# Asenkron engine (FastAPI route'ları için)
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    echo=settings.DEBUG
+)
+
+# Asenkron session factory; commit sonrası nesneler yanıtta kullanılabilsin diye expire edilmez
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -35,4 +62,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    """Asenkron veritabanı session'ı döndür"""
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Cursor (keyset) sayfalama yardımcıları
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """Sıralama anahtarını opak bir cursor'a çevir"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """
+    Cursor'ı sıralama anahtarına çevirir
+
+    Args:
+        cursor: encode_cursor ile üretilmiş cursor
+        types: Anahtar alanlarının tipleri (ör. datetime, int)
+
+    Returns:
+        Anahtar değerleri
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("cursor length mismatch")
+        return [
+            datetime.fromisoformat(value) if value_type is datetime else value_type(value)
+            for value_type, value in zip(types, payload)
+        ]
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor: {str(e)}"
+        )
+
+
+def paginate(
+    rows: Sequence[Any],
+    limit: int,
+    key: Callable[[Any], Tuple[Any, ...]]
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    limit + 1 satırlık sorgu sonucundan sayfayı ve sonraki cursor'ı üretir
+
+    Args:
+        rows: limit + 1 ile sorgulanmış satırlar
+        limit: Sayfa boyutu
+        key: Satırın sıralama anahtarı
+
+    Returns:
+        (sayfa satırları, sonraki cursor veya son sayfada None)
+    """
+    items = list(rows[:limit])
+    if len(rows) > limit and items:
+        return items, encode_cursor(*key(items[-1]))
+    return items, None
@@ -0,0 +1,14 @@
+"""
+Redis bağlantı yönetimi
+"""
+import redis
+
+from app.core.config import settings
+
+# Paylaşılan Redis istemcisi (bağlantılar ilk komutta açılır)
+redis_client = redis.Redis.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    socket_connect_timeout=2,
+    socket_timeout=5
+)
@@ -1,10 +1,12 @@
 """
 Pydantic şemaları - API request/response modelleri
 """
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, List
+from pydantic import BaseModel, HttpUrl, field_validator
+from typing import Optional, List, Dict, Generic, TypeVar
 from datetime import datetime
 
+from app.core.config import settings
+
 
 # Wishlist Şemaları
 class WishlistBase(BaseModel):
@@ -12,10 +14,16 @@ class WishlistBase(BaseModel):
     store_name: str
     url: HttpUrl
     auto_purchase: bool = False
+    user_id: Optional[int] = None  # boşsa bildirimler tüm kullanıcılara (topic) gider
 
 
 class WishlistCreate(WishlistBase):
-    pass
+    @field_validator("store_name")
+    @classmethod
+    def validate_store_name(cls, value: str) -> str:
+        if value not in settings.SUPPORTED_STORES:
+            raise ValueError(f"Unsupported store, expected one of: {', '.join(settings.SUPPORTED_STORES)}")
+        return value
 
 
 class WishlistUpdate(BaseModel):
@@ -23,6 +31,7 @@ class WishlistUpdate(BaseModel):
     url: Optional[HttpUrl] = None
     is_active: Optional[bool] = None
     auto_purchase: Optional[bool] = None
+    user_id: Optional[int] = None
 
 
 class WishlistItemBase(BaseModel):
@@ -56,7 +65,9 @@ class WishlistResponse(WishlistBase):
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
-    items: List[WishlistItemResponse] = []
+    item_count: Optional[int] = None
+    in_stock_count: Optional[int] = None
+    items: Optional[List[WishlistItemResponse]] = None  # özet modda (include_items=false) boş
 
     class Config:
         from_attributes = True
@@ -135,6 +146,26 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class FCMTokenUpdate(BaseModel):
+    fcm_token: Optional[str] = None  # None cihaz kaydını siler
+
+
+# Arka plan işi şemaları
+class WishlistJobResponse(BaseModel):
+    job_id: str
+    wishlist_id: int
+    status: str = "PENDING"
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str  # PENDING, STARTED, PROGRESS, SUCCESS, FAILURE
+    stage: Optional[str] = None  # scraping, saving, done, skipped, failed
+    wishlist_id: Optional[int] = None
+    counts: Optional[Dict[str, int]] = None
+    error: Optional[str] = None
+
+
 # API Response Şemaları
 class APIResponse(BaseModel):
     success: bool
@@ -142,6 +173,14 @@ class APIResponse(BaseModel):
     data: Optional[dict] = None
 
 
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # None ise son sayfa
+
+
 class PaginatedResponse(BaseModel):
     items: List[dict]
     total: int
@@ -1,7 +1,7 @@
 """
 Bildirim modeli
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,6 +11,12 @@ from app.core.database import Base
 class Notification(Base):
     """Bildirim modeli"""
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Eski bildirimlerin temizliği için
+        Index("ix_notifications_created_at_id", "created_at", "id"),
+        # Dispatcher'ın gönderilmemiş bildirimleri bulması için
+        Index("ix_notifications_outbox", "is_sent", "next_attempt_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     wishlist_id = Column(Integer, ForeignKey("wishlists.id"), nullable=False)
@@ -20,6 +26,11 @@ class Notification(Base):
     notification_type = Column(String(50), default="stock_alert")  # stock_alert, price_drop, etc.
     is_sent = Column(Boolean, default=False)
     sent_at = Column(DateTime(timezone=True))
+    # Outbox alanları (bkz. notification_outbox)
+    attempts = Column(Integer, default=0, nullable=False)  # Başarısız gönderim denemesi sayısı
+    next_attempt_at = Column(DateTime(timezone=True))  # Tekrar denemeden önce beklenecek zaman
+    locked_until = Column(DateTime(timezone=True))  # Dispatcher kirası
+    last_error = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # İlişkiler
@@ -1,7 +1,7 @@
 """
 Ürün modeli
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, Index
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -10,6 +10,11 @@ from app.core.database import Base
 class Product(Base):
     """Ürün modeli"""
     __tablename__ = "products"
+    __table_args__ = (
+        # Filtreli cursor sayfalaması için
+        Index("ix_products_store_name_id", "store_name", "id"),
+        Index("ix_products_is_in_stock_id", "is_in_stock", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(String(100), unique=True, nullable=False, index=True)
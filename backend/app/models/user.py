@@ -2,6 +2,7 @@
 Kullanıcı modeli
 """
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -16,9 +17,12 @@ class User(Base):
     email = Column(String(100), unique=True, nullable=False, index=True)
     hashed_password = Column(String(200), nullable=False)
     is_active = Column(Boolean, default=True)
-    fcm_token = Column(String(500))  # Firebase Cloud Messaging token
+    fcm_token = Column(String(500), index=True)  # Firebase Cloud Messaging token
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # İlişkiler
+    wishlists = relationship("Wishlist", back_populates="user")
+    
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>" 
\ No newline at end of file
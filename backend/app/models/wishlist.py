@@ -1,7 +1,7 @@
 """
 Wishlist modelleri
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -19,11 +19,13 @@ class Wishlist(Base):
     url = Column(Text, nullable=False)
     is_active = Column(Boolean, default=True)
     auto_purchase = Column(Boolean, default=False)  # Otomatik satın alma
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)  # Bildirimlerin gönderileceği kullanıcı
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # İlişkiler
     items = relationship("WishlistItem", back_populates="wishlist", cascade="all, delete-orphan")
+    user = relationship("User", back_populates="wishlists")
     
     def __repr__(self):
         return f"<Wishlist(id={self.id}, name='{self.name}', store='{self.store_name}')>"
@@ -32,6 +34,10 @@ class Wishlist(Base):
 class WishlistItem(Base):
     """Wishlist ürün modeli"""
     __tablename__ = "wishlist_items"
+    __table_args__ = (
+        # Wishlist ürünlerinin cursor sayfalaması ve sayımları için
+        Index("ix_wishlist_items_wishlist_id_id", "wishlist_id", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     wishlist_id = Column(Integer, ForeignKey("wishlists.id"), nullable=False)
@@ -44,6 +50,8 @@ class WishlistItem(Base):
     color = Column(String(50))
     is_in_stock = Column(Boolean, default=False)
     last_checked = Column(DateTime(timezone=True), server_default=func.now())
+    stock_change_count = Column(Integer, default=0, nullable=False)  # Gözlemlenen stok değişimi sayısı
+    last_stock_change_at = Column(DateTime(timezone=True))  # Son stok değişimi zamanı
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -0,0 +1,260 @@
+"""
+Tarayıcı havuzu - Celery worker süreci başına paylaşılan, yeniden kullanılabilir Selenium driver'ları
+"""
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import List, Optional
+
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from loguru import logger
+
+from app.core.config import settings
+
+
+class BrowserPoolTimeout(Exception):
+    """Havuzdan belirtilen süre içinde tarayıcı alınamadı"""
+
+
+class PooledBrowser:
+    """Havuzdaki tek bir Chrome örneği ve kullanım istatistikleri"""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages_loaded = 0
+        self.created_at = time.monotonic()
+        self.service_pid = driver.service.process.pid if driver.service.process else None
+
+    def process_tree(self) -> List[psutil.Process]:
+        """chromedriver ve altındaki tüm Chrome süreçlerini döndür"""
+        if not self.service_pid:
+            return []
+        try:
+            root = psutil.Process(self.service_pid)
+            return [root] + root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            return []
+
+    def rss_mb(self) -> float:
+        """Süreç ağacının toplam RSS kullanımı (MB)"""
+        total = 0
+        for proc in self.process_tree():
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / (1024 * 1024)
+
+    def is_healthy(self) -> bool:
+        """Driver hâlâ komutlara yanıt veriyor mu"""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+
+class BrowserPool:
+    """
+    Sınırlı sayıda sıcak Chrome örneği tutan havuz
+
+    Tarayıcılar ilk ihtiyaçta oluşturulur ve süreç içinde paylaşılır. Bu sayede
+    Celery prefork modunda her worker süreci kendi havuzunu fork sonrası kurar.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.BROWSER_POOL_SIZE,
+        max_pages: int = settings.BROWSER_MAX_PAGES,
+        max_rss_mb: int = settings.BROWSER_MAX_RSS_MB,
+    ):
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self._idle: List[PooledBrowser] = []
+        self._size = 0
+        self._pid = os.getpid()
+        self._driver_path: Optional[str] = None
+        self._condition = threading.Condition()
+
+    def _build_options(self) -> Options:
+        """Chrome seçeneklerini hazırla"""
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument(f"--user-agent={settings.USER_AGENT}")
+        
+        # Yalın profil: DOM hazır olunca dön, görsel ve medya indirme
+        chrome_options.page_load_strategy = "eager"
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_argument("--mute-audio")
+        chrome_options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.media_stream": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+        return chrome_options
+
+    def _create_browser(self) -> PooledBrowser:
+        """Yeni bir Chrome örneği başlat"""
+        # ChromeDriverManager().install() süreç başına bir kez çalışsın
+        if self._driver_path is None:
+            self._driver_path = ChromeDriverManager().install()
+
+        driver = webdriver.Chrome(
+            service=Service(self._driver_path),
+            options=self._build_options()
+        )
+        driver.set_page_load_timeout(settings.BROWSER_PAGE_LOAD_TIMEOUT)
+        
+        # Stil, font, video ve üçüncü parti takip isteklerini ağ seviyesinde engelle
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": settings.BROWSER_BLOCKED_URLS})
+        logger.info(f"Started pooled browser (pool size: {self._size}/{self.max_size})")
+        return PooledBrowser(driver)
+
+    def _destroy_browser(self, browser: PooledBrowser):
+        """Tarayıcıyı kapat ve geride kalan Chrome süreçlerini öldür"""
+        leftovers = browser.process_tree()
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting pooled browser: {str(e)}")
+
+        for proc in leftovers:
+            try:
+                if proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE:
+                    proc.kill()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        self._reap_zombies()
+
+    def _reap_zombies(self):
+        """Bu süreçten türemiş zombi Chrome süreçlerini topla"""
+        for child in psutil.Process().children(recursive=True):
+            try:
+                if child.status() == psutil.STATUS_ZOMBIE:
+                    child.wait(timeout=0)
+            except (psutil.NoSuchProcess, psutil.TimeoutExpired, ChildProcessError):
+                continue
+
+    def _needs_recycle(self, browser: PooledBrowser) -> bool:
+        """Tarayıcı sayfa veya bellek sınırını aştı mı"""
+        if browser.pages_loaded >= self.max_pages:
+            logger.info(f"Recycling browser after {browser.pages_loaded} pages")
+            return True
+        rss = browser.rss_mb()
+        if rss >= self.max_rss_mb:
+            logger.info(f"Recycling browser using {rss:.0f} MB RSS")
+            return True
+        return False
+
+    def _reset_after_fork(self):
+        """Fork sonrası ebeveynden gelen durumu at"""
+        if self._pid != os.getpid():
+            self._idle = []
+            self._size = 0
+            self._pid = os.getpid()
+
+    def acquire(self, timeout: float = settings.BROWSER_CHECKOUT_TIMEOUT) -> PooledBrowser:
+        """Havuzdan sağlıklı bir tarayıcı al, gerekirse yenisini başlat"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._reset_after_fork()
+            while True:
+                while self._idle:
+                    browser = self._idle.pop()
+                    if browser.is_healthy():
+                        return browser
+                    logger.warning("Discarding unhealthy pooled browser")
+                    self._size -= 1
+                    self._destroy_browser(browser)
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise BrowserPoolTimeout("No browser available in pool")
+                self._condition.wait(remaining)
+
+        try:
+            return self._create_browser()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, browser: PooledBrowser, discard: bool = False):
+        """Tarayıcıyı havuza geri koy veya sınırı aştıysa kapat"""
+        if discard or self._needs_recycle(browser):
+            self._destroy_browser(browser)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            return
+
+        with self._condition:
+            self._idle.append(browser)
+            self._condition.notify()
+
+    @contextmanager
+    def checkout(self, timeout: float = settings.BROWSER_CHECKOUT_TIMEOUT):
+        """
+        Havuzdan bir driver ödünç alır
+
+        Args:
+            timeout: Boş tarayıcı için beklenecek en uzun süre (saniye)
+
+        Yields:
+            Selenium driver
+        """
+        browser = self.acquire(timeout)
+        broken = False
+        try:
+            yield browser.driver
+        except Exception:
+            broken = not browser.is_healthy()
+            raise
+        finally:
+            browser.pages_loaded += 1
+            self.release(browser, discard=broken)
+
+    @asynccontextmanager
+    async def async_checkout(self, timeout: float = settings.BROWSER_CHECKOUT_TIMEOUT):
+        """
+        checkout() ile aynı, ancak bekleme ve iade işlemlerini event loop'u
+        bloklamadan thread'de yapar
+        """
+        browser = await asyncio.to_thread(self.acquire, timeout)
+        broken = False
+        try:
+            yield browser.driver
+        except Exception:
+            broken = not await asyncio.to_thread(browser.is_healthy)
+            raise
+        finally:
+            browser.pages_loaded += 1
+            await asyncio.to_thread(self.release, browser, broken)
+
+    def close(self):
+        """Havuzdaki tüm boştaki tarayıcıları kapat"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for browser in idle:
+            self._destroy_browser(browser)
+        logger.info(f"Closed {len(idle)} pooled browsers")
+
+
+# Global browser pool instance (süreç başına)
+browser_pool = BrowserPool()
@@ -0,0 +1,141 @@
+"""
+Kontrol zamanlayıcısı - Ürünleri bir sonraki kontrol zamanına göre sıralayan öncelik kuyruğu
+"""
+import random
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+import redis
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+# Zamanı gelen ürünleri al ve tamamlanmazlarsa tekrar denenmek üzere ileri ertele
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+for _, member in ipairs(due) do
+    redis.call('ZADD', KEYS[1], ARGV[3], member)
+end
+return due
+"""
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive (UTC varsayılan) veya aware datetime'ı naive UTC'ye çevir"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def next_interval(
+    store_name: str,
+    stock_change_count: int,
+    last_stock_change_at: Optional[datetime],
+    created_at: Optional[datetime],
+    now: Optional[datetime] = None
+) -> float:
+    """
+    Ürünün bir sonraki kontrolüne kadar geçecek süreyi hesaplar
+
+    Sık stok değiştiren ve yakın zamanda değişen ürünler daha sık, uzun süredir
+    değişmeyenler daha seyrek kontrol edilir. Mağaza çarpanı ve sessiz saatler
+    uygulanır, sonuç CHECK_INTERVAL_MIN/MAX arasına sıkıştırılır.
+
+    Args:
+        store_name: Mağaza adı
+        stock_change_count: Gözlemlenen stok değişimi sayısı
+        last_stock_change_at: Son stok değişimi zamanı
+        created_at: Ürünün eklenme zamanı
+        now: Şimdiki zaman (UTC)
+
+    Returns:
+        Saniye cinsinden aralık
+    """
+    now = now or datetime.utcnow()
+    created_at = _as_utc(created_at) or now
+    last_change = _as_utc(last_stock_change_at) or created_at
+
+    interval = settings.STOCK_CHECK_INTERVAL * 60
+
+    # Değişim sıklığı: günde bir değişim aralığı yarıya indirir
+    age_days = max((now - created_at).total_seconds() / 86400, 1)
+    interval /= 1 + (stock_change_count or 0) / age_days
+
+    # Yakınlık: son 24 saatte değiştiyse sıcak, sonrasında haftada bir kat seyrekleşir
+    idle_days = (now - last_change).total_seconds() / 86400
+    interval *= 0.5 if idle_days < 1 else 1 + idle_days / 7
+
+    store_config = settings.SUPPORTED_STORES.get(store_name, {})
+    interval *= store_config.get("check_interval_factor", 1.0)
+
+    local_hour = now.replace(tzinfo=timezone.utc).astimezone(ZoneInfo(settings.SCHEDULE_TIMEZONE)).hour
+    if local_hour in settings.QUIET_HOURS:
+        interval *= settings.QUIET_HOURS_FACTOR
+
+    # Aynı anda eklenen ürünlerin aynı anda kontrol edilmemesi için küçük sapma
+    interval *= random.uniform(0.9, 1.1)
+    return min(max(interval, settings.CHECK_INTERVAL_MIN * 60), settings.CHECK_INTERVAL_MAX * 60)
+
+
+class CheckScheduler:
+    """
+    Redis sorted set üzerinde ürün kontrol kuyruğu
+
+    Üyeler WishlistItem id'leri, skorlar bir sonraki kontrol zamanıdır (epoch).
+    claim_due() zamanı gelen ürünleri alırken CHECK_CLAIM_TIMEOUT kadar ileri
+    erteler; kontrol tamamlanınca schedule() gerçek zamanı yazar, tamamlanmayan
+    kontroller ise süre dolunca tekrar alınır.
+    """
+
+    KEY = "schedule:wishlist_items"
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+        self._claim = client.register_script(CLAIM_DUE_SCRIPT)
+
+    def schedule(self, item_id: int, interval: float):
+        """Ürünün bir sonraki kontrolünü interval saniye sonrasına planla"""
+        try:
+            self.client.zadd(self.KEY, {str(item_id): time.time() + interval})
+        except redis.RedisError as e:
+            logger.warning(f"Could not schedule item {item_id}: {str(e)}")
+
+    def seed(self, item_ids: Iterable[int]) -> int:
+        """
+        Kuyrukta olmayan ürünleri döngü içine yayarak ekler
+
+        Returns:
+            Yeni eklenen ürün sayısı
+        """
+        window = settings.STOCK_CHECK_INTERVAL * 60
+        now = time.time()
+        mapping = {str(item_id): now + random.uniform(0, window) for item_id in item_ids}
+        if not mapping:
+            return 0
+        try:
+            return self.client.zadd(self.KEY, mapping, nx=True)
+        except redis.RedisError as e:
+            logger.warning(f"Could not seed {len(mapping)} items: {str(e)}")
+            return 0
+
+    def claim_due(self, limit: int = settings.CHECK_DISPATCH_BATCH) -> List[int]:
+        """Zamanı gelen en fazla limit ürünü al"""
+        now = time.time()
+        due = self._claim(
+            keys=[self.KEY],
+            args=[now, limit, now + settings.CHECK_CLAIM_TIMEOUT]
+        )
+        return [int(item_id) for item_id in due]
+
+    def remove(self, item_ids: Iterable[int]):
+        """Silinen veya pasif ürünleri kuyruktan çıkar"""
+        members = [str(item_id) for item_id in item_ids]
+        if members:
+            self.client.zrem(self.KEY, *members)
+
+
+# Global check scheduler instance
+check_scheduler = CheckScheduler()
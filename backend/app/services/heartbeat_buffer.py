@@ -0,0 +1,104 @@
+"""
+Heartbeat tamponu - last_checked zamanlarını Redis'te biriktirip toplu yazar
+"""
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+
+import redis
+from loguru import logger
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.orm import Session
+
+from app.core.redis_client import redis_client
+from app.models.wishlist import WishlistItem
+
+
+class HeartbeatBuffer:
+    """
+    WishlistItem.last_checked için write-behind tampon
+
+    Stok durumu değişmeyen kontrollerde satır güncellenmez; kontrol zamanı
+    Redis hash'ine yazılır ve flush() ile periyodik olarak tek bir toplu
+    UPDATE'le veritabanına aktarılır. Gerçek durum değişiklikleri tampona
+    uğramadan doğrudan yazılmaya devam eder.
+    """
+
+    KEY = "heartbeat:wishlist_items"
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+
+    def record(self, item_ids: Iterable[int], checked_at: Optional[datetime] = None) -> bool:
+        """
+        Ürünlerin kontrol edildiğini kaydeder
+
+        Args:
+            item_ids: WishlistItem id'leri
+            checked_at: Kontrol zamanı (varsayılan: şimdi)
+
+        Returns:
+            Başarı durumu; False ise çağıran zamanı doğrudan yazmalıdır
+        """
+        checked_at = (checked_at or datetime.utcnow()).isoformat()
+        mapping = {str(item_id): checked_at for item_id in item_ids}
+        if not mapping:
+            return True
+        try:
+            self.client.hset(self.KEY, mapping=mapping)
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Could not buffer heartbeats: {str(e)}")
+            return False
+
+    def _drain(self) -> Dict[str, str]:
+        """Tampondaki kayıtları atomik olarak al ve tamponu boşalt"""
+        flushing_key = f"{self.KEY}:flushing:{uuid.uuid4().hex}"
+        try:
+            self.client.rename(self.KEY, flushing_key)
+        except redis.ResponseError:
+            # Tampon boş
+            return {}
+        pipe = self.client.pipeline()
+        pipe.hgetall(flushing_key)
+        pipe.delete(flushing_key)
+        entries, _ = pipe.execute()
+        return entries
+
+    def flush(self, db: Session) -> int:
+        """
+        Tampondaki kontrol zamanlarını tek bir toplu UPDATE ile yazar
+
+        Returns:
+            Güncellenen ürün sayısı
+        """
+        entries = self._drain()
+        if not entries:
+            return 0
+
+        rows = [
+            {"item_id": int(item_id), "checked_at": datetime.fromisoformat(checked_at)}
+            for item_id, checked_at in entries.items()
+        ]
+        table = WishlistItem.__table__
+        try:
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam("item_id"))
+                # Bu arada doğrudan yazılmış daha yeni bir zamanı geri alma
+                .where(or_(table.c.last_checked.is_(None), table.c.last_checked < bindparam("checked_at")))
+                .values(last_checked=bindparam("checked_at")),
+                rows
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Yazılamayan kayıtları geri koy (bu arada gelen daha yeni kayıtları ezme)
+            for item_id, checked_at in entries.items():
+                self.client.hsetnx(self.KEY, item_id, checked_at)
+            raise
+        return len(rows)
+
+
+# Global heartbeat buffer instance
+heartbeat_buffer = HeartbeatBuffer()
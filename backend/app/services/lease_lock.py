@@ -0,0 +1,99 @@
+"""
+Kiralık kilit - Süresi kendiliğinden dolan, sahibi belli Redis kilitleri
+"""
+import time
+from typing import Optional, Tuple
+
+import redis
+from loguru import logger
+
+from app.core.redis_client import redis_client
+from app.services.single_flight import RELEASE_LOCK_SCRIPT
+
+
+class LeaseLock:
+    """
+    Redis üzerinde sahip kimlikli kiralık kilit
+
+    Sahip olarak Celery görev id'si kullanılır; böylece kilidi tutan işi
+    sormak, o işin durumunu sormakla aynı şeydir. Aynı sahip kilidi tekrar
+    alabilir (ör. endpoint'in ayırdığı kilidi görevin kendisi devralır).
+    Kilit düşen süreçlerde ttl sonunda kendiliğinden açılır.
+    """
+
+    def __init__(self, prefix: str, client: redis.Redis = redis_client):
+        self.prefix = prefix
+        self.client = client
+        self._release = client.register_script(RELEASE_LOCK_SCRIPT)
+
+    def _key(self, name: str) -> str:
+        return f"lease:{self.prefix}:{name}"
+
+    def acquire(self, name: str, owner: str, ttl: int) -> Tuple[bool, Optional[str]]:
+        """
+        Kilidi almaya çalışır
+
+        Args:
+            name: Kilit adı (ör. wishlist id)
+            owner: Sahip kimliği
+            ttl: Kira süresi (saniye)
+
+        Returns:
+            (alındı mı, kilidi tutan sahip)
+        """
+        key = self._key(name)
+        try:
+            if self.client.set(key, owner, nx=True, ex=ttl):
+                return True, owner
+
+            holder = self.client.get(key)
+            if holder == owner:
+                # Aynı sahip, kirayı yenile
+                self.client.expire(key, ttl)
+                return True, owner
+            if holder is None:
+                # Kilit bu arada açıldı
+                return self.acquire(name, owner, ttl)
+            return False, holder
+        except redis.RedisError as e:
+            # Redis yoksa işi engelleme, kilitsiz devam et
+            logger.warning(f"Lease lock unavailable for {key}: {str(e)}")
+            return True, owner
+
+    def wait(self, name: str, owner: str, ttl: int, timeout: float, interval: float = 0.2) -> bool:
+        """
+        Kilidi en fazla timeout saniye bekleyerek almaya çalışır
+
+        Returns:
+            Kilit alındı mı
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            acquired, _ = self.acquire(name, owner, ttl)
+            if acquired:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def holder(self, name: str) -> Optional[str]:
+        """Kilidi tutan sahip (yoksa None)"""
+        try:
+            return self.client.get(self._key(name))
+        except redis.RedisError as e:
+            logger.warning(f"Lease lock unavailable for {self._key(name)}: {str(e)}")
+            return None
+
+    def release(self, name: str, owner: str):
+        """Kilidi yalnızca sahibi ise bırakır"""
+        try:
+            self._release(keys=[self._key(name)], args=[owner])
+        except redis.RedisError as e:
+            logger.warning(f"Could not release lease lock {self._key(name)}: {str(e)}")
+
+
+# Global wishlist lock instance
+# wishlist_lock: tam wishlist kontrolünün kirası (görev id'si iş id'si olarak döner)
+# wishlist_write_lock: wishlist ürünlerine stok sonucu yazılırken kısa süreli kilit
+wishlist_lock = LeaseLock("wishlist")
+wishlist_write_lock = LeaseLock("wishlist-write")
@@ -0,0 +1,73 @@
+"""
+Bildirim bekleme süresi - Aynı ürün için NOTIFICATION_COOLDOWN içinde tekrar bildirim gönderilmez
+"""
+from typing import Iterable, List
+
+import redis
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+
+class NotificationCooldown:
+    """
+    Redis SET NX EX ile ürün başına bildirim bekleme süresi
+
+    Stokta/tükendi arasında gidip gelen ürünler her döngüde yeniden
+    bildirim üretmez. Redis'e ulaşılamazsa bildirimler engellenmez.
+    """
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+
+    def _key(self, wishlist_id: int, product_id: str) -> str:
+        return f"notify:cooldown:{wishlist_id}:{product_id}"
+
+    def acquire(self, wishlist_id: int, product_ids: Iterable[str]) -> List[str]:
+        """
+        Bekleme süresinde olmayan ürünler için süreyi başlatır
+
+        Args:
+            wishlist_id: Wishlist id'si
+            product_ids: Stoğa giren ürünler
+
+        Returns:
+            Bildirim gönderilebilecek ürünler
+        """
+        product_ids = list(product_ids)
+        if not product_ids:
+            return []
+        try:
+            pipe = self.client.pipeline()
+            for product_id in product_ids:
+                pipe.set(
+                    self._key(wishlist_id, product_id), 1,
+                    nx=True, ex=settings.NOTIFICATION_COOLDOWN * 60
+                )
+            acquired = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Notification cooldown unavailable: {str(e)}")
+            return product_ids
+
+        allowed = [product_id for product_id, ok in zip(product_ids, acquired) if ok]
+        if len(allowed) < len(product_ids):
+            logger.info(
+                f"Suppressed {len(product_ids) - len(allowed)} notifications in cooldown "
+                f"for wishlist {wishlist_id}"
+            )
+        return allowed
+
+    def release(self, wishlist_id: int, product_ids: Iterable[str]):
+        """Bildirimi yazılamayan ürünlerin bekleme süresini geri al"""
+        keys = [self._key(wishlist_id, product_id) for product_id in product_ids]
+        if not keys:
+            return
+        try:
+            self.client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Could not release notification cooldown: {str(e)}")
+
+
+# Global notification cooldown instance
+notification_cooldown = NotificationCooldown()
@@ -0,0 +1,217 @@
+"""
+Bildirim outbox'ı - notifications tablosunu kalıcı gönderim kuyruğu olarak kullanır
+"""
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+import redis
+from loguru import logger
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.models.notification import Notification
+
+
+class NotificationOutbox:
+    """
+    Transactional outbox
+
+    Stok değişimini yazan transaction bildirimi de aynı commit'te ekler;
+    gönderim ayrı bir dispatcher tarafından yapılır. Dispatcher satırları
+    locked_until kirasıyla sahiplenir (Postgres'te FOR UPDATE SKIP LOCKED),
+    böylece birden fazla dispatcher aynı satırı göndermez ve düşen bir
+    dispatcher'ın satırları kira dolunca tekrar alınır.
+    """
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+
+    def window_deadline(self, wishlist_id: int) -> datetime:
+        """
+        Wishlist'in açık birleştirme penceresinin bitişini döndürür
+
+        Pencere wishlist'in ilk bildirimiyle açılır ve NOTIFICATION_COALESCE_WINDOW
+        sürer; bu sürede yazılan tüm bildirimler aynı bitişe kadar bekletilir ve
+        birlikte kiralanır. Redis'e ulaşılamazsa pencere bildirimle başlar.
+        """
+        window = settings.NOTIFICATION_COALESCE_WINDOW
+        deadline = time.time() + window
+        key = f"notify:window:{wishlist_id}"
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(key, deadline, nx=True, ex=window)
+            pipe.get(key)
+            _, stored = pipe.execute()
+            if stored is not None:
+                deadline = float(stored)
+        except redis.RedisError as e:
+            logger.warning(f"Notification window unavailable for wishlist {wishlist_id}: {str(e)}")
+        return datetime.utcfromtimestamp(deadline)
+
+    def add_stock_alert(
+        self,
+        db: Session,
+        wishlist_id: int,
+        wishlist_name: str,
+        product_id: str,
+        product_name: str
+    ) -> Notification:
+        """
+        Stok bildirimini commit edilmeden session'a ekler
+
+        Bildirim wishlist'in birleştirme penceresi kapanınca gönderilebilir hale
+        gelir (bkz. window_deadline); böylece pencerede aynı wishlist için
+        yazılan diğer bildirimlerle aynı özet push'ta birleşir.
+
+        Returns:
+            Eklenen bildirim
+        """
+        notification = Notification(
+            wishlist_id=wishlist_id,
+            product_id=product_id,
+            title=f"Stok Geldi! - {wishlist_name}",
+            message=f"{product_name} ürünü stokta! Hemen satın alabilirsiniz.",
+            notification_type="stock_alert",
+            next_attempt_at=self.window_deadline(wishlist_id)
+        )
+        db.add(notification)
+        return notification
+
+    def coalesce(self, notifications: List[Notification]) -> List[Tuple[Dict[str, Any], List[Notification]]]:
+        """
+        Aynı wishlist'in stok bildirimlerini tek bir özet push'ta birleştirir
+
+        Args:
+            notifications: Kiralanan bildirimler
+
+        Returns:
+            (send_batch mesajı, mesajın kapsadığı bildirimler) listesi
+        """
+        groups: Dict[Tuple, List[Notification]] = {}
+        for notification in notifications:
+            if notification.notification_type == "stock_alert":
+                key = ("stock_alert", notification.wishlist_id)
+            else:
+                key = ("single", notification.id)
+            groups.setdefault(key, []).append(notification)
+
+        messages = []
+        for group in groups.values():
+            first = group[0]
+            message = {
+                "title": first.title,
+                "message": first.message,
+                "data": {
+                    "wishlist_id": first.wishlist_id,
+                    "product_id": first.product_id,
+                    "notification_type": first.notification_type
+                },
+                "fcm_tokens": None
+            }
+            if len(group) > 1:
+                message["message"] = f"{len(group)} ürün stokta! Hemen satın alabilirsiniz."
+                message["data"]["product_ids"] = ",".join(n.product_id for n in group)
+            messages.append((message, group))
+        return messages
+
+    def _due(self, now: datetime):
+        """Gönderilmeyi bekleyen ve kirası olmayan satırların koşulu"""
+        return and_(
+            Notification.is_sent == False,
+            Notification.attempts < settings.NOTIFICATION_MAX_ATTEMPTS,
+            or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= now),
+            or_(Notification.locked_until.is_(None), Notification.locked_until < now),
+        )
+
+    def claim(self, db: Session, limit: int = settings.NOTIFICATION_BATCH_SIZE) -> List[Notification]:
+        """
+        Gönderilecek bildirimleri kiralayarak alır ve commit eder
+
+        Args:
+            db: Veritabanı session'ı
+            limit: En fazla alınacak bildirim sayısı
+
+        Returns:
+            Bu dispatcher'a ait bildirimler (session'dan ayrılmış)
+        """
+        now = datetime.utcnow()
+        ids = db.execute(
+            select(Notification.id)
+            .where(self._due(now))
+            .order_by(Notification.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            db.rollback()
+            return []
+
+        # Koşul tekrar kontrol edilir; SKIP LOCKED olmayan veritabanlarında
+        # yalnızca kirayı gerçekten alan dispatcher satırı geri alır
+        claimed = db.execute(
+            update(Notification)
+            .where(Notification.id.in_(ids), self._due(now))
+            .values(locked_until=now + timedelta(seconds=settings.NOTIFICATION_LEASE))
+            .returning(Notification)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        # Commit satırları expire eder; ayrılan satırlar yeniden yüklenmeden okunur
+        for notification in claimed:
+            db.expunge(notification)
+        db.commit()
+        return claimed
+
+    def complete(
+        self,
+        db: Session,
+        sent_ids: List[int],
+        failures: Dict[int, str],
+        permanent: Iterable[int] = ()
+    ):
+        """
+        Gönderim sonuçlarını toplu olarak işler
+
+        Args:
+            db: Veritabanı session'ı
+            sent_ids: Gönderilen bildirimler
+            failures: Gönderilemeyen bildirimler ve hata mesajları
+            permanent: failures içinden tekrar denenmeyecek olanlar (deneme hakkı bitirilir)
+        """
+        permanent = set(permanent)
+        now = datetime.utcnow()
+        if sent_ids:
+            db.execute(
+                update(Notification)
+                .where(Notification.id.in_(sent_ids))
+                .values(is_sent=True, sent_at=now, locked_until=None, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+
+        if failures:
+            attempts = dict(db.execute(
+                select(Notification.id, Notification.attempts).where(Notification.id.in_(failures))
+            ).all())
+            db.execute(update(Notification), [
+                {
+                    "id": notification_id,
+                    "attempts": (
+                        settings.NOTIFICATION_MAX_ATTEMPTS if notification_id in permanent
+                        else attempts.get(notification_id, 0) + 1
+                    ),
+                    # Üstel geri çekilme: 30 sn, 1 dk, 2 dk, ...
+                    "next_attempt_at": now + timedelta(
+                        seconds=settings.NOTIFICATION_RETRY_DELAY * 2 ** attempts.get(notification_id, 0)
+                    ),
+                    "locked_until": None,
+                    "last_error": error[:500],
+                }
+                for notification_id, error in failures.items()
+            ])
+        db.commit()
+
+
+# Global notification outbox instance
+notification_outbox = NotificationOutbox()
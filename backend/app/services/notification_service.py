@@ -3,18 +3,221 @@ Bildirim servisi - Firebase Cloud Messaging ile push notification
 """
 import json
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional
 from loguru import logger
 
 from app.core.config import settings
 
 
+# Legacy FCM HTTP API'nin tek istekte kabul ettiği en fazla token sayısı
+FCM_MAX_TOKENS_PER_REQUEST = 1000
+
+# Token artık geçerli değil, tekrar denenmemeli ve silinmeli
+FCM_INVALID_TOKEN_ERRORS = {"NotRegistered", "InvalidRegistration", "MismatchSenderId"}
+
+# Geçici hatalar, token daha sonra tekrar denenebilir
+FCM_RETRYABLE_ERRORS = {"Unavailable", "InternalServerError", "DeviceMessageRateExceeded"}
+
+
+class PushResult:
+    """Bir bildirimin gönderim sonucu"""
+
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.failed_tokens: List[str] = []
+        self.invalid_tokens: List[str] = []
+        self.retry_tokens: List[str] = []
+        self.error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.sent > 0
+
+    @property
+    def retryable(self) -> bool:
+        """Başarısız gönderim tekrar denenmeli mi (geçici hata varsa veya hiçbir token reddedilmediyse)"""
+        return bool(self.retry_tokens) or not self.failed_tokens
+
+    def __repr__(self):
+        return (
+            f"<PushResult(sent={self.sent}, failed={self.failed}, "
+            f"invalid={len(self.invalid_tokens)}, retry={len(self.retry_tokens)})>"
+        )
+
+
 class NotificationService:
     """Bildirim servisi"""
     
     def __init__(self):
         self.fcm_url = "https://fcm.googleapis.com/fcm/send"
-        self.api_key = None  # Firebase API key buraya gelecek
+        self.api_key = settings.FCM_SERVER_KEY
+        
+        # Keep-alive bağlantı havuzu; her bildirimde yeni TCP+TLS el sıkışması yapılmaz
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.FCM_MAX_WORKERS)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+    
+    def _build_payload(self, title: str, message: str, data: Optional[Dict]) -> Dict:
+        """FCM payload'ı hazırla (alıcılar hariç)"""
+        return {
+            "notification": {
+                "title": title,
+                "body": message,
+                "sound": "default",
+                "badge": "1"
+            },
+            "data": data or {},
+            "priority": "high"
+        }
+    
+    def _post(self, payload: Dict) -> Dict:
+        """FCM'e tek istek gönderir; HTTP hatalarında requests.HTTPError fırlatır"""
+        response = self.session.post(
+            self.fcm_url,
+            data=json.dumps(payload),
+            headers={"Authorization": f"key={self.api_key}"},
+            timeout=settings.HTTP_TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def _send_chunk(self, payload: Dict, tokens: Optional[List[str]]) -> PushResult:
+        """
+        Tek bir FCM isteği gönderir ve token bazında sonucu ayrıştırır
+
+        Args:
+            payload: Alıcılar hariç payload
+            tokens: En fazla FCM_MAX_TOKENS_PER_REQUEST token (None ise topic)
+        """
+        result = PushResult()
+        payload = dict(payload)
+        if tokens:
+            payload["registration_ids"] = tokens
+        else:
+            payload["to"] = "/topics/stokizleme"  # Tüm kullanıcılara gönder
+        
+        try:
+            response = self._post(payload)
+        except requests.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else None
+            result.error = f"FCM request failed: {status_code}"
+            result.failed = len(tokens or [None])
+            result.failed_tokens = list(tokens or [])
+            # Sunucu tarafı ve hız sınırı hataları tekrar denenebilir
+            if tokens and (status_code == 429 or (status_code or 0) >= 500):
+                result.retry_tokens = list(tokens)
+            return result
+        except requests.RequestException as e:
+            result.error = f"FCM request error: {str(e)}"
+            result.failed = len(tokens or [None])
+            result.failed_tokens = list(tokens or [])
+            if tokens:
+                result.retry_tokens = list(tokens)
+            return result
+        
+        if not tokens:
+            if "message_id" in response:
+                result.sent = 1
+            else:
+                result.failed = 1
+                result.error = str(response.get("error"))
+            return result
+        
+        # results, registration_ids ile aynı sıradadır
+        for token, token_result in zip(tokens, response.get("results", [])):
+            error = token_result.get("error")
+            if not error:
+                result.sent += 1
+                continue
+            result.failed += 1
+            result.failed_tokens.append(token)
+            if error in FCM_INVALID_TOKEN_ERRORS:
+                result.invalid_tokens.append(token)
+            elif error in FCM_RETRYABLE_ERRORS:
+                result.retry_tokens.append(token)
+            result.error = error
+        return result
+    
+    def send_batch(self, messages: List[Dict]) -> List[PushResult]:
+        """
+        Birden fazla bildirimi eşzamanlı ve toplu gönderir
+
+        Aynı içerikli bildirimler tek payload'da birleştirilir, token listeleri
+        FCM_MAX_TOKENS_PER_REQUEST'lik parçalara bölünür ve istekler en fazla
+        FCM_MAX_WORKERS eşzamanlı bağlantıyla gönderilir.
+
+        Args:
+            messages: title, message, data ve fcm_tokens (None ise topic) içeren sözlükler
+
+        Returns:
+            Girdi sırasıyla her bildirimin sonucu
+        """
+        results = [PushResult() for _ in messages]
+        if not messages:
+            return results
+        
+        if not self.api_key:
+            logger.warning("Firebase API key not configured, skipping notification")
+            for result in results:
+                result.error = "Firebase API key not configured"
+            return results
+        
+        # Aynı payload'a sahip bildirimleri grupla
+        groups: Dict[str, Dict] = {}
+        for index, message in enumerate(messages):
+            payload = self._build_payload(message["title"], message["message"], message.get("data"))
+            group_key = json.dumps(payload, sort_keys=True, default=str)
+            group = groups.setdefault(group_key, {"payload": payload, "indexes": [], "tokens": [], "topic": False})
+            group["indexes"].append(index)
+            if message.get("fcm_tokens"):
+                group["tokens"].extend(message["fcm_tokens"])
+            else:
+                group["topic"] = True
+        
+        # Her grup için istek parçalarını hazırla
+        chunks = []
+        for group in groups.values():
+            tokens = list(dict.fromkeys(group["tokens"]))
+            for start in range(0, len(tokens), FCM_MAX_TOKENS_PER_REQUEST):
+                chunks.append((group, tokens[start:start + FCM_MAX_TOKENS_PER_REQUEST]))
+            if group["topic"]:
+                chunks.append((group, None))
+        
+        with ThreadPoolExecutor(max_workers=settings.FCM_MAX_WORKERS) as executor:
+            futures = [
+                (group, executor.submit(self._send_chunk, group["payload"], tokens))
+                for group, tokens in chunks
+            ]
+            for (group, tokens), (_, future) in zip(chunks, futures):
+                chunk_result = future.result()
+                failed_tokens = set(chunk_result.failed_tokens)
+                # Parça sonucunu gruptaki her bildirimin kendi alıcılarına dağıt
+                for index in group["indexes"]:
+                    own_tokens = messages[index].get("fcm_tokens")
+                    result = results[index]
+                    if tokens is None:
+                        if own_tokens:
+                            continue
+                        result.sent += chunk_result.sent
+                        result.failed += chunk_result.failed
+                    else:
+                        own_in_chunk = set(own_tokens or []) & set(tokens)
+                        if not own_in_chunk:
+                            continue
+                        own_failed = own_in_chunk & failed_tokens
+                        result.sent += len(own_in_chunk) - len(own_failed)
+                        result.failed += len(own_failed)
+                        result.failed_tokens.extend(own_failed)
+                        result.invalid_tokens.extend(t for t in chunk_result.invalid_tokens if t in own_in_chunk)
+                        result.retry_tokens.extend(t for t in chunk_result.retry_tokens if t in own_in_chunk)
+                    result.error = result.error or chunk_result.error
+        
+        logger.info(f"Sent {len(messages)} notifications in {len(chunks)} FCM requests")
+        return results
         
     def send_push_notification(
         self, 
@@ -36,52 +239,17 @@ class NotificationService:
             Başarı durumu
         """
         try:
-            if not self.api_key:
-                logger.warning("Firebase API key not configured, skipping notification")
-                return False
-            
-            # FCM payload'ı hazırla
-            payload = {
-                "notification": {
-                    "title": title,
-                    "body": message,
-                    "sound": "default",
-                    "badge": "1"
-                },
-                "data": data or {},
-                "priority": "high"
-            }
-            
-            # Token listesi varsa kullan, yoksa topic'e gönder
-            if fcm_tokens:
-                payload["registration_ids"] = fcm_tokens
-            else:
-                payload["to"] = "/topics/stokizleme"  # Tüm kullanıcılara gönder
-            
-            # Headers
-            headers = {
-                "Authorization": f"key={self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # FCM'e gönder
-            response = requests.post(
-                self.fcm_url,
-                data=json.dumps(payload),
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                if result.get("success", 0) > 0:
-                    logger.info(f"Push notification sent successfully: {title}")
-                    return True
-                else:
-                    logger.error(f"FCM error: {result}")
-                    return False
-            else:
-                logger.error(f"FCM request failed: {response.status_code} - {response.text}")
-                return False
+            result, = self.send_batch([{
+                "title": title,
+                "message": message,
+                "data": data,
+                "fcm_tokens": fcm_tokens
+            }])
+            if result.success:
+                logger.info(f"Push notification sent successfully: {title}")
+            elif result.error:
+                logger.error(f"FCM error: {result.error}")
+            return result.success
                 
         except Exception as e:
             logger.error(f"Error sending push notification: {str(e)}")
@@ -0,0 +1,123 @@
+"""
+Sayfa önbelleği - URL başına ETag/Last-Modified ve normalize içerik hash'i
+"""
+import hashlib
+import json
+import re
+from typing import Any, Dict, Optional
+
+import redis
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+# Her istekte değişen ama ürün verisini etkilemeyen parçalar
+_VOLATILE_PATTERNS = [
+    re.compile(r"<!--.*?-->", re.DOTALL),
+    re.compile(r'\s(?:nonce|data-csrf|csrf-token)="[^"]*"', re.IGNORECASE),
+    re.compile(r'<meta[^>]+name="csrf[^"]*"[^>]*>', re.IGNORECASE),
+]
+_WHITESPACE = re.compile(r"\s+")
+
+
+def content_hash(html: str) -> str:
+    """HTML'i normalize edip SHA-256 hash'ini döndür"""
+    for pattern in _VOLATILE_PATTERNS:
+        html = pattern.sub("", html)
+    html = _WHITESPACE.sub(" ", html).strip()
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class PageCache:
+    """
+    Koşullu istek ve içerik hash önbelleği
+
+    Girdiler sayfayı işleyen tüketiciye göre anahtarlanır (ör. wishlist:12,
+    product:<url hash>); aynı URL'i izleyen iki kayıt birbirinin güncellemesini
+    atlatmaz.
+
+    Yeni doğrulayıcılar önce "pending" olarak yazılır ve ancak sayfanın
+    verisi veritabanına işlendikten sonra commit() ile kalıcı hale gelir.
+    Böylece yarıda kalan bir kontrol sonraki döngüde atlanmaz.
+    """
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+
+    def _key(self, cache_key: str) -> str:
+        return f"pagecache:{cache_key}"
+
+    def _get(self, cache_key: str) -> Dict[str, str]:
+        try:
+            return self.client.hgetall(self._key(cache_key))
+        except redis.RedisError as e:
+            logger.warning(f"Page cache unavailable: {str(e)}")
+            return {}
+
+    def conditional_headers(self, cache_key: str) -> Dict[str, str]:
+        """Son işlenen sürüm için If-None-Match / If-Modified-Since başlıkları"""
+        cached = self._get(cache_key)
+        headers = {}
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        return headers
+
+    def is_unchanged(self, cache_key: str, html: str) -> bool:
+        """İçerik son işlenen sürümle aynı mı"""
+        return self._get(cache_key).get("hash") == content_hash(html)
+
+    def get_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Son işlenen sürümle birlikte kaydedilen ayrıştırma sonucu"""
+        result = self._get(cache_key).get("result")
+        return json.loads(result) if result else None
+
+    def stage(
+        self,
+        cache_key: str,
+        html: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """Yeni sürümün doğrulayıcılarını commit edilmek üzere beklet"""
+        entry = {"hash": content_hash(html)}
+        if etag:
+            entry["etag"] = etag
+        if last_modified:
+            entry["last_modified"] = last_modified
+
+        pending_key = f"{self._key(cache_key)}:pending"
+        try:
+            pipe = self.client.pipeline()
+            pipe.delete(pending_key)
+            pipe.hset(pending_key, mapping=entry)
+            pipe.expire(pending_key, settings.PAGE_CACHE_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not stage page cache entry for {cache_key}: {str(e)}")
+
+    def commit(self, cache_key: str, result: Optional[Dict[str, Any]] = None):
+        """
+        Bekleyen sürümü son işlenen sürüm olarak kaydet
+
+        Args:
+            cache_key: Önbellek anahtarı
+            result: Sayfa değişmediğinde yeniden kullanılacak ayrıştırma sonucu
+        """
+        key = self._key(cache_key)
+        try:
+            if self.client.exists(f"{key}:pending"):
+                pipe = self.client.pipeline()
+                if result is not None:
+                    pipe.hset(f"{key}:pending", "result", json.dumps(result))
+                pipe.rename(f"{key}:pending", key)
+                pipe.expire(key, settings.PAGE_CACHE_TTL)
+                pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not commit page cache entry for {cache_key}: {str(e)}")
+
+
+# Global page cache instance
+page_cache = PageCache()
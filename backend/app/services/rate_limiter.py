@@ -0,0 +1,137 @@
+"""
+Hız sınırlayıcı - Mağaza başına, tüm worker'larca paylaşılan Redis token bucket
+"""
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import redis
+from loguru import logger
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+
+
+# Token'ı rezerve eder ve beklenmesi gereken süreyi (ms) döndürür.
+# KEYS: bucket, penalty, pause   ARGV: rate (token/sn), burst
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local penalty = tonumber(redis.call('GET', KEYS[2]) or '1')
+rate = rate / penalty
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate / 1000) - 1
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 60000)
+
+local wait = 0
+if tokens < 0 then
+    wait = math.ceil(-tokens * 1000 / rate)
+end
+local pause = redis.call('PTTL', KEYS[3])
+if pause > wait then
+    wait = pause
+end
+return wait
+"""
+
+
+class RateLimiter:
+    """
+    Mağaza başına token bucket hız sınırlayıcı
+
+    Durum Redis'te tutulduğu için tüm Celery worker'ları ve API süreçleri aynı
+    bütçeyi paylaşır. 429/503 yanıtlarında mağazanın hızı geçici olarak
+    düşürülür. Redis erişilemezse süreç içi bucket'a düşülür.
+    """
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._local_lock = threading.Lock()
+        self._redis_retry_at = 0.0
+
+    def _limits(self, store_name: str) -> Tuple[float, int]:
+        """Mağazanın saniyelik hızını ve burst boyutunu döndür"""
+        store_config = settings.SUPPORTED_STORES.get(store_name, {})
+        rate = store_config.get("rate_per_second", 1 / settings.SCRAPING_DELAY)
+        burst = store_config.get("burst", settings.RATE_LIMIT_BURST)
+        return rate, burst
+
+    def _reserve_local(self, store_name: str) -> float:
+        """Redis yokken süreç içi bucket'tan token rezerve et"""
+        rate, burst = self._limits(store_name)
+        with self._local_lock:
+            now = time.monotonic()
+            tokens, ts = self._local.get(store_name, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate) - 1
+            self._local[store_name] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+    def reserve(self, store_name: str) -> float:
+        """
+        Mağaza için bir token rezerve eder
+
+        Returns:
+            İstek atmadan önce beklenmesi gereken süre (saniye)
+        """
+        # Redis kısa süre önce hata verdiyse her istekte bağlantı denemesi yapma
+        if time.monotonic() < self._redis_retry_at:
+            return self._reserve_local(store_name)
+
+        rate, burst = self._limits(store_name)
+        key = f"ratelimit:{store_name}"
+        try:
+            wait_ms = self._script(
+                keys=[key, f"{key}:penalty", f"{key}:pause"],
+                args=[rate, burst]
+            )
+            return wait_ms / 1000
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter falling back to local bucket: {str(e)}")
+            self._redis_retry_at = time.monotonic() + 30
+            return self._reserve_local(store_name)
+
+    async def acquire(self, store_name: str):
+        """Token alınana kadar event loop'u bloklamadan bekle"""
+        wait = await asyncio.to_thread(self.reserve, store_name)
+        if wait > 0:
+            logger.debug(f"Rate limited {store_name}, waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def report(self, store_name: str, status_code: int, retry_after: Optional[str] = None):
+        """
+        Mağaza yanıtını bildirir, 429/503'te hızı yavaşlatır
+
+        Args:
+            store_name: Mağaza adı
+            status_code: HTTP durum kodu
+            retry_after: Retry-After başlığı (saniye)
+        """
+        if status_code not in (429, 503):
+            return
+
+        key = f"ratelimit:{store_name}"
+        try:
+            penalty = float(self.client.get(f"{key}:penalty") or 1)
+            penalty = min(penalty * 2, settings.RATE_LIMIT_MAX_PENALTY)
+            self.client.set(f"{key}:penalty", penalty, ex=settings.RATE_LIMIT_PENALTY_TTL)
+
+            if retry_after and retry_after.isdigit():
+                self.client.set(f"{key}:pause", 1, ex=int(retry_after))
+            logger.warning(f"{store_name} returned {status_code}, slowing down by {penalty:g}x")
+        except redis.RedisError as e:
+            logger.warning(f"Could not record rate limit penalty for {store_name}: {str(e)}")
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter()
@@ -2,246 +2,218 @@
 Web scraping servisi - Mağaza sitelerinden ürün bilgilerini çeker
 """
 import asyncio
-import json
-import time
-from typing import List, Dict, Optional
-from selenium import webdriver
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
 import requests
 from loguru import logger
 
 from app.core.config import settings
+from app.services.browser_pool import browser_pool
+from app.services.page_cache import page_cache
+from app.services.rate_limiter import rate_limiter
+from app.services.store_adapters import StoreAdapter, get_store_adapter
+
+
+class ScrapeError(Exception):
+    """Sayfa çekilemediğinde veya mağaza desteklenmediğinde fırlatılır"""
+    pass
 
 
 class ScraperService:
     """Web scraping servisi"""
     
     def __init__(self):
-        self.driver = None
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': settings.USER_AGENT
         })
     
-    def _setup_driver(self):
-        """Selenium driver'ı hazırla"""
-        if self.driver is None:
-            chrome_options = Options()
-            chrome_options.add_argument("--headless")
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument(f"--user-agent={settings.USER_AGENT}")
-            
-            self.driver = webdriver.Chrome(
-                ChromeDriverManager().install(),
-                options=chrome_options
-            )
+    def _fetch_html(
+        self,
+        store_name: str,
+        url: str,
+        cache_key: Optional[str] = None
+    ) -> Optional[requests.Response]:
+        """
+        Sayfayı tarayıcı olmadan HTTP ile indir
+        
+        Returns:
+            200 (veya koşullu istekte 304) yanıtı, aksi halde None
+        """
+        conditional = cache_key is not None
+        headers = page_cache.conditional_headers(cache_key) if conditional else None
+        try:
+            response = self.session.get(url, headers=headers, timeout=settings.HTTP_TIMEOUT)
+        except requests.RequestException as e:
+            logger.warning(f"HTTP fetch failed for {url}: {str(e)}")
+            return None
+        
+        rate_limiter.report(store_name, response.status_code, response.headers.get("Retry-After"))
+        if response.status_code == 304 and conditional:
+            return response
+        if response.status_code != 200:
+            logger.warning(f"HTTP fetch returned {response.status_code} for {url}")
+            return None
+        return response
     
-    def _cleanup_driver(self):
-        """Driver'ı temizle"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+    async def _load_and_parse(
+        self,
+        adapter: StoreAdapter,
+        url: str,
+        ready_selector: str,
+        parse: Callable[[str], Any],
+        cache_key: Optional[str]
+    ) -> Tuple[Any, bool, bool]:
+        """
+        Sayfayı HTTP hızlı yolu veya tarayıcı ile yükleyip ayrıştırır
+        
+        Returns:
+            (ayrıştırma sonucu, sayfa son işlenen sürümle aynı mı,
+            sayfa tamamen yüklendi mi)
+        """
+        # Hızlı yol: mağaza render gerektirmiyorsa düz HTTP ile dene
+        if not adapter.requires_render:
+            await rate_limiter.acquire(adapter.name)
+            response = await asyncio.to_thread(self._fetch_html, adapter.name, url, cache_key)
+            if response is not None and response.status_code == 304:
+                return None, True, True
+            
+            html = response.text if response is not None else None
+            if html and cache_key and await asyncio.to_thread(page_cache.is_unchanged, cache_key, html):
+                return None, True, True
+            
+            result = await asyncio.to_thread(parse, html) if html else None
+            if result is not None:
+                if cache_key:
+                    await asyncio.to_thread(
+                        page_cache.stage, cache_key, html,
+                        response.headers.get("ETag"), response.headers.get("Last-Modified")
+                    )
+                logger.info(f"Fetched {url} over HTTP")
+                return result, False, True
+            logger.info(f"Falling back to browser rendering for {url}")
+        
+        html, complete = await self._render_html(adapter.name, url, ready_selector)
+        # Yarım render edilmiş sayfa önbelleğe alınmaz; sonraki kontrol yeniden işler
+        if cache_key and complete:
+            if await asyncio.to_thread(page_cache.is_unchanged, cache_key, html):
+                return None, True, True
+            await asyncio.to_thread(page_cache.stage, cache_key, html)
+        logger.info(f"Fetched {url} with browser")
+        return await asyncio.to_thread(parse, html), False, complete
     
-    async def scrape_wishlist(self, store_name: str, wishlist_url: str) -> List[Dict]:
+    async def scrape_wishlist(
+        self,
+        store_name: str,
+        wishlist_url: str,
+        cache_key: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict], bool]]:
         """
         Wishlist'ten ürün bilgilerini çeker
         
         Args:
             store_name: Mağaza adı (zara, bershka, pullandbear)
             wishlist_url: Wishlist URL'i
+            cache_key: Verilirse sayfa bu anahtarla son işlenen sürümle aynıysa
+                ayrıştırma atlanır (bkz. page_cache)
             
         Returns:
-            Ürün listesi
+            (ürün listesi, sayfa tamamen yüklendi mi), sayfa değişmediyse None.
+            Sayfa tamamen yüklenmediyse liste eksik olabilir.
+        
+        Raises:
+            ScrapeError: Mağaza desteklenmiyorsa veya sayfa çekilemezse; boş
+                wishlist ile başarısız taramanın karışmaması için
         """
+        adapter = get_store_adapter(store_name)
+        if not adapter:
+            logger.error(f"Unsupported store: {store_name}")
+            raise ScrapeError(f"Unsupported store: {store_name}")
+        
         try:
-            self._setup_driver()
-            
             logger.info(f"Scraping wishlist from {store_name}: {wishlist_url}")
-            
-            # Sayfayı yükle
-            self.driver.get(wishlist_url)
-            time.sleep(settings.SCRAPING_DELAY)
-            
-            # Mağaza spesifik scraping
-            if store_name == "zara":
-                return await self._scrape_zara_wishlist()
-            elif store_name == "bershka":
-                return await self._scrape_bershka_wishlist()
-            elif store_name == "pullandbear":
-                return await self._scrape_pullandbear_wishlist()
-            else:
-                logger.error(f"Unsupported store: {store_name}")
-                return []
+            products, unchanged, complete = await self._load_and_parse(
+                adapter, wishlist_url, adapter.wishlist_ready_selector,
+                adapter.parse_wishlist, cache_key
+            )
+            if unchanged:
+                logger.info(f"Wishlist unchanged since last check: {wishlist_url}")
+                return None
+            return products or [], complete
                 
         except Exception as e:
             logger.error(f"Error scraping wishlist from {store_name}: {str(e)}")
-            return []
-        finally:
-            self._cleanup_driver()
+            raise ScrapeError(f"Error scraping wishlist from {store_name}: {str(e)}") from e
     
-    async def _scrape_zara_wishlist(self) -> List[Dict]:
-        """Zara wishlist scraping"""
-        products = []
-        
-        try:
-            # Ürün kartlarını bul
-            product_cards = self.driver.find_elements(By.CSS_SELECTOR, ".product-item")
-            
-            for card in product_cards:
-                try:
-                    product = {
-                        "product_id": card.get_attribute("data-product-id") or "",
-                        "product_name": "",
-                        "product_url": "",
-                        "product_image": "",
-                        "price": "",
-                        "size": "",
-                        "color": "",
-                        "is_in_stock": False
-                    }
-                    
-                    # Ürün adı
-                    name_elem = card.find_element(By.CSS_SELECTOR, ".product-name")
-                    if name_elem:
-                        product["product_name"] = name_elem.text.strip()
-                    
-                    # Ürün URL'i
-                    link_elem = card.find_element(By.CSS_SELECTOR, "a")
-                    if link_elem:
-                        product["product_url"] = link_elem.get_attribute("href")
-                    
-                    # Ürün resmi
-                    img_elem = card.find_element(By.CSS_SELECTOR, "img")
-                    if img_elem:
-                        product["product_image"] = img_elem.get_attribute("src")
-                    
-                    # Fiyat
-                    price_elem = card.find_element(By.CSS_SELECTOR, ".price")
-                    if price_elem:
-                        product["price"] = price_elem.text.strip()
-                    
-                    # Stok durumu
-                    stock_elem = card.find_element(By.CSS_SELECTOR, ".product-availability")
-                    if stock_elem:
-                        product["is_in_stock"] = "stokta" in stock_elem.text.lower()
-                    
-                    products.append(product)
-                    
-                except NoSuchElementException:
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error scraping Zara wishlist: {str(e)}")
-        
-        return products
-    
-    async def _scrape_bershka_wishlist(self) -> List[Dict]:
-        """Bershka wishlist scraping"""
-        products = []
+    def _wait_for_selector(self, driver, selector: str) -> bool:
+        """
+        Seçici DOM'a gelene kadar bekle, gelmezse mevcut DOM ile devam et
         
+        Returns:
+            Seçici bulundu mu
+        """
         try:
-            # Bershka için benzer scraping mantığı
-            product_cards = self.driver.find_elements(By.CSS_SELECTOR, ".product-item")
-            
-            for card in product_cards:
-                try:
-                    product = {
-                        "product_id": card.get_attribute("data-product-id") or "",
-                        "product_name": "",
-                        "product_url": "",
-                        "product_image": "",
-                        "price": "",
-                        "size": "",
-                        "color": "",
-                        "is_in_stock": False
-                    }
-                    
-                    # Bershka spesifik selectors
-                    name_elem = card.find_element(By.CSS_SELECTOR, ".product-name")
-                    if name_elem:
-                        product["product_name"] = name_elem.text.strip()
-                    
-                    link_elem = card.find_element(By.CSS_SELECTOR, "a")
-                    if link_elem:
-                        product["product_url"] = link_elem.get_attribute("href")
-                    
-                    products.append(product)
-                    
-                except NoSuchElementException:
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error scraping Bershka wishlist: {str(e)}")
-        
-        return products
+            WebDriverWait(driver, settings.BROWSER_RENDER_TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            )
+            return True
+        except TimeoutException:
+            logger.warning(f"Timed out waiting for '{selector}' on {driver.current_url}")
+            return False
     
-    async def _scrape_pullandbear_wishlist(self) -> List[Dict]:
-        """Pull&Bear wishlist scraping"""
-        products = []
+    async def _render_html(self, store_name: str, url: str, ready_selector: str) -> Tuple[str, bool]:
+        """
+        Sayfayı havuzdaki tarayıcıda render eder
         
-        try:
-            # Pull&Bear için benzer scraping mantığı
-            product_cards = self.driver.find_elements(By.CSS_SELECTOR, ".product-item")
-            
-            for card in product_cards:
-                try:
-                    product = {
-                        "product_id": card.get_attribute("data-product-id") or "",
-                        "product_name": "",
-                        "product_url": "",
-                        "product_image": "",
-                        "price": "",
-                        "size": "",
-                        "color": "",
-                        "is_in_stock": False
-                    }
-                    
-                    # Pull&Bear spesifik selectors
-                    name_elem = card.find_element(By.CSS_SELECTOR, ".product-name")
-                    if name_elem:
-                        product["product_name"] = name_elem.text.strip()
-                    
-                    link_elem = card.find_element(By.CSS_SELECTOR, "a")
-                    if link_elem:
-                        product["product_url"] = link_elem.get_attribute("href")
-                    
-                    products.append(product)
-                    
-                except NoSuchElementException:
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error scraping Pull&Bear wishlist: {str(e)}")
+        DOM tek seferde page_source ile alınır ve yerelde ayrıştırılır; böylece
+        kart/alan başına WebDriver isteği yapılmaz.
         
-        return products
+        Returns:
+            (HTML, hazır seçicisi bulundu mu)
+        """
+        # Token tarayıcı alınmadan beklenir; yavaşlatılan mağaza havuzu meşgul etmez
+        await rate_limiter.acquire(store_name)
+        async with browser_pool.async_checkout() as driver:
+            await asyncio.to_thread(driver.get, url)
+            complete = await asyncio.to_thread(self._wait_for_selector, driver, ready_selector)
+            return await asyncio.to_thread(getattr, driver, "page_source"), complete
     
-    async def check_product_stock(self, product_url: str, store_name: str) -> Dict:
+    async def check_product_stock(
+        self,
+        product_url: str,
+        store_name: str,
+        cache_key: Optional[str] = None
+    ) -> Optional[Dict]:
         """
         Tek bir ürünün stok durumunu kontrol eder
         
         Args:
             product_url: Ürün URL'i
             store_name: Mağaza adı
+            cache_key: Verilirse sayfa bu anahtarla son işlenen sürümle aynıysa
+                ayrıştırma atlanır (bkz. page_cache)
             
         Returns:
-            Stok durumu bilgisi
+            Stok durumu bilgisi, sayfa değişmediyse None
         """
+        adapter = get_store_adapter(store_name)
+        if not adapter:
+            logger.error(f"Unsupported store: {store_name}")
+            return {"is_in_stock": False, "error": f"Unsupported store: {store_name}"}
+        
         try:
-            self._setup_driver()
-            
             logger.info(f"Checking stock for product: {product_url}")
-            
-            self.driver.get(product_url)
-            time.sleep(settings.SCRAPING_DELAY)
-            
-            stock_info = {
+            stock_info, unchanged, _ = await self._load_and_parse(
+                adapter, product_url, adapter.product_ready_selector,
+                adapter.parse_product, cache_key
+            )
+            if unchanged:
+                logger.info(f"Product page unchanged since last check: {product_url}")
+                return None
+            return stock_info or {
                 "is_in_stock": False,
                 "available_sizes": [],
                 "available_colors": [],
@@ -249,59 +221,9 @@ class ScraperService:
                 "last_checked": None
             }
             
-            # Mağaza spesifik stok kontrolü
-            if store_name == "zara":
-                return await self._check_zara_stock()
-            elif store_name == "bershka":
-                return await self._check_bershka_stock()
-            elif store_name == "pullandbear":
-                return await self._check_pullandbear_stock()
-            
         except Exception as e:
             logger.error(f"Error checking stock for {product_url}: {str(e)}")
             return {"is_in_stock": False, "error": str(e)}
-        finally:
-            self._cleanup_driver()
-    
-    async def _check_zara_stock(self) -> Dict:
-        """Zara stok kontrolü"""
-        try:
-            # Stok durumu
-            stock_elem = self.driver.find_element(By.CSS_SELECTOR, ".product-availability")
-            is_in_stock = "stokta" in stock_elem.text.lower() if stock_elem else False
-            
-            # Mevcut bedenler
-            sizes = []
-            size_elems = self.driver.find_elements(By.CSS_SELECTOR, ".size-selector .size")
-            for size_elem in size_elems:
-                if "disabled" not in size_elem.get_attribute("class"):
-                    sizes.append(size_elem.text.strip())
-            
-            # Fiyat
-            price_elem = self.driver.find_element(By.CSS_SELECTOR, ".price")
-            price = price_elem.text.strip() if price_elem else None
-            
-            return {
-                "is_in_stock": is_in_stock,
-                "available_sizes": sizes,
-                "available_colors": [],
-                "price": price,
-                "last_checked": None
-            }
-            
-        except Exception as e:
-            logger.error(f"Error checking Zara stock: {str(e)}")
-            return {"is_in_stock": False, "error": str(e)}
-    
-    async def _check_bershka_stock(self) -> Dict:
-        """Bershka stok kontrolü"""
-        # Bershka için benzer mantık
-        return {"is_in_stock": False, "available_sizes": [], "available_colors": []}
-    
-    async def _check_pullandbear_stock(self) -> Dict:
-        """Pull&Bear stok kontrolü"""
-        # Pull&Bear için benzer mantık
-        return {"is_in_stock": False, "available_sizes": [], "available_colors": []}
 
 
 # Global scraper instance
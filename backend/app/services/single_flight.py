@@ -0,0 +1,135 @@
+"""
+Single-flight - Aynı anahtar için eşzamanlı istekleri tek bir çalıştırmada birleştirir
+"""
+import asyncio
+import json
+import time
+import uuid
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis
+from loguru import logger
+
+from app.core.redis_client import redis_client
+
+# Kilit yalnızca sahibi tarafından silinir
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Süreç içi ve Redis üzerinden süreçler arası single-flight
+
+    Aynı süreçteki çağrılar tek bir asyncio.Task'ı bekler. Farklı worker'lar
+    ise Redis kilidiyle bir lider seçer; diğerleri liderin sonucu Redis'e
+    yazmasını bekler. Sonuç ttl boyunca saklanır, böylece aynı döngüde
+    sonradan gelen çağrılar da yeniden çalıştırmaz.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis = redis_client,
+        lock_ttl: int = 120,
+        poll_interval: float = 0.5
+    ):
+        self.client = client
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._release = client.register_script(RELEASE_LOCK_SCRIPT)
+        # Süreç içi bekleyen görevler, event loop başına
+        self._inflight = weakref.WeakKeyDictionary()
+
+    def _local_tasks(self) -> Dict[str, asyncio.Task]:
+        loop = asyncio.get_running_loop()
+        tasks = self._inflight.get(loop)
+        if tasks is None:
+            tasks = {}
+            self._inflight[loop] = tasks
+        return tasks
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        ttl: int,
+        should_cache: Callable[[Any], bool] = lambda result: True
+    ) -> Any:
+        """
+        fn'i anahtar başına yalnızca bir kez çalıştırır
+
+        Args:
+            key: Birleştirme anahtarı
+            fn: Sonucu JSON'a çevrilebilir coroutine fabrikası
+            ttl: Sonucun paylaşılacağı süre (saniye)
+            should_cache: Sonuç paylaşılmalı mı (ör. hatalı sonuçlar paylaşılmaz)
+
+        Returns:
+            fn sonucu (kendi çalıştırmamız veya başka bir çağrının sonucu)
+        """
+        tasks = self._local_tasks()
+        task = tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._do_shared(key, fn, ttl, should_cache))
+            tasks[key] = task
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _get_result(self, result_key: str) -> Optional[Any]:
+        cached = await asyncio.to_thread(self.client.get, result_key)
+        return json.loads(cached) if cached is not None else None
+
+    async def _do_shared(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        ttl: int,
+        should_cache: Callable[[Any], bool]
+    ) -> Any:
+        """Redis üzerinden lider seçip sonucu paylaş"""
+        result_key = f"singleflight:{key}:result"
+        lock_key = f"singleflight:{key}:lock"
+        token = uuid.uuid4().hex
+
+        try:
+            deadline = time.monotonic() + self.lock_ttl
+            while time.monotonic() < deadline:
+                cached = await self._get_result(result_key)
+                if cached is not None:
+                    return cached
+
+                acquired = await asyncio.to_thread(
+                    self.client.set, lock_key, token, nx=True, ex=self.lock_ttl
+                )
+                if acquired:
+                    break
+                await asyncio.sleep(self.poll_interval)
+            else:
+                logger.warning(f"Timed out waiting for in-flight result of {key}, running locally")
+                return await fn()
+        except redis.RedisError as e:
+            logger.warning(f"Single-flight unavailable for {key}: {str(e)}")
+            return await fn()
+
+        try:
+            result = await fn()
+            if should_cache(result):
+                try:
+                    await asyncio.to_thread(self.client.set, result_key, json.dumps(result), ex=ttl)
+                except redis.RedisError as e:
+                    logger.warning(f"Could not share single-flight result for {key}: {str(e)}")
+            return result
+        finally:
+            try:
+                await asyncio.to_thread(self._release, keys=[lock_key], args=[token])
+            except redis.RedisError as e:
+                logger.warning(f"Could not release single-flight lock for {key}: {str(e)}")
+
+
+# Global single-flight instance
+single_flight = SingleFlight()
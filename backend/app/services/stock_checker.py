@@ -0,0 +1,228 @@
+"""
+Stok kontrol motoru - Çok sayıda ürün/wishlist kontrolünü asyncio ile eşzamanlı çalıştırır
+"""
+import asyncio
+import hashlib
+import weakref
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from app.core.config import settings
+from app.services.page_cache import page_cache
+from app.services.scraper_service import scraper_service
+from app.services.single_flight import single_flight
+
+
+class StockCheckerBusy(Exception):
+    """Anlık kontrol havuzu dolu olduğunda fırlatılır"""
+    pass
+
+
+class StockChecker:
+    """
+    Asenkron stok kontrol motoru
+
+    Tüm kontroller global ve mağaza başına semaphore'larla sınırlandırılır.
+    FastAPI route'ları coroutine'leri doğrudan await eder, senkron Celery
+    görevleri ise run() ile çalıştırır. Sınırlar loop başınadır; run() her
+    çağrıda yeni bir loop açtığı için birlikte sınırlanması gereken
+    kontroller tek bir run() içinde (check_products) çalıştırılmalıdır.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.MAX_CONCURRENT_CHECKS,
+        store_concurrency: int = settings.STORE_CONCURRENCY,
+    ):
+        self.max_concurrency = max_concurrency
+        self.store_concurrency = store_concurrency
+        # Semaphore'lar event loop'a bağlıdır, bu yüzden loop başına tutulur
+        self._limits = weakref.WeakKeyDictionary()
+
+    def _loop_limits(self) -> Dict[str, asyncio.Semaphore]:
+        """Çalışan loop'un semaphore tablosu"""
+        loop = asyncio.get_running_loop()
+        limits = self._limits.get(loop)
+        if limits is None:
+            limits = {
+                "__all__": asyncio.Semaphore(self.max_concurrency),
+                # Anlık kontroller: çalışanlar ve sırada bekleyebilecekler
+                "__on_demand__": asyncio.Semaphore(settings.ON_DEMAND_CHECK_CONCURRENCY),
+                "__on_demand_admission__": asyncio.Semaphore(
+                    settings.ON_DEMAND_CHECK_CONCURRENCY + settings.ON_DEMAND_CHECK_QUEUE
+                ),
+            }
+            self._limits[loop] = limits
+        return limits
+
+    def _get_limits(self, store_name: str) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        """Çalışan loop için global ve mağaza semaphore'larını döndür"""
+        limits = self._loop_limits()
+
+        if store_name not in limits:
+            store_config = settings.SUPPORTED_STORES.get(store_name, {})
+            limits[store_name] = asyncio.Semaphore(
+                store_config.get("max_concurrency", self.store_concurrency)
+            )
+        return limits["__all__"], limits[store_name]
+
+    async def _limited(self, store_name: str, coro: Awaitable[Any]) -> Any:
+        """Coroutine'i eşzamanlılık sınırları içinde çalıştır"""
+        global_limit, store_limit = self._get_limits(store_name)
+        async with store_limit:
+            async with global_limit:
+                return await coro
+
+    async def check_product(
+        self,
+        store_name: str,
+        product_url: str,
+        cache_key: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Tek bir ürünün stok durumunu kontrol eder
+
+        Args:
+            store_name: Mağaza adı
+            product_url: Ürün URL'i
+            cache_key: Verilirse sayfa değişmediğinde None döner (bkz. page_cache)
+
+        Returns:
+            Stok durumu bilgisi
+        """
+        return await self._limited(
+            store_name,
+            scraper_service.check_product_stock(product_url, store_name, cache_key)
+        )
+
+    async def _check_product_bounded(self, store_name: str, product_url: str) -> Dict:
+        """Anlık kontrolü sınırlı havuzda çalıştır; havuz ve sıra doluysa reddet"""
+        limits = self._loop_limits()
+        admission = limits["__on_demand_admission__"]
+        if admission.locked():
+            raise StockCheckerBusy("Too many stock checks in progress")
+        async with admission:
+            async with limits["__on_demand__"]:
+                return await self.check_product(store_name, product_url)
+
+    async def check_product_on_demand(self, store_name: str, product_url: str) -> Dict:
+        """
+        Kullanıcının istediği anlık ürün kontrolü
+
+        Aynı (mağaza, URL) için eşzamanlı istekler tek bir kontrolü paylaşır ve
+        sonuç ON_DEMAND_CACHE_TTL boyunca önbellekten döner. Yeni kontroller
+        sınırlı bir havuzda çalışır; havuz ve bekleme sırası doluysa
+        StockCheckerBusy fırlatılır.
+
+        Args:
+            store_name: Mağaza adı
+            product_url: Ürün URL'i
+
+        Returns:
+            Stok durumu bilgisi
+        """
+        digest = hashlib.sha1(f"{store_name}|{product_url}".encode("utf-8")).hexdigest()
+        return await single_flight.do(
+            f"on-demand:{digest}",
+            lambda: self._check_product_bounded(store_name, product_url),
+            ttl=settings.ON_DEMAND_CACHE_TTL,
+            should_cache=lambda stock_info: "error" not in stock_info
+        )
+
+    async def _check_product_cached(self, store_name: str, product_url: str, cache_key: str) -> Dict:
+        """Ürünü kontrol et; sayfa değişmediyse son ayrıştırma sonucunu kullan"""
+        stock_info = await self.check_product(store_name, product_url, cache_key=cache_key)
+        if stock_info is None:
+            stock_info = await asyncio.to_thread(page_cache.get_result, cache_key)
+            if stock_info is None:
+                stock_info = await self.check_product(store_name, product_url)
+            return stock_info
+
+        if "error" not in stock_info:
+            await asyncio.to_thread(page_cache.commit, cache_key, stock_info)
+        return stock_info
+
+    async def check_product_shared(self, store_name: str, product_url: str) -> Dict:
+        """
+        Ürünü, aynı URL'i izleyen tüm wishlist ürünleri adına tek seferde kontrol eder
+
+        Kısa bir pencere içinde (PRODUCT_SHARE_TTL) aynı URL için gelen çağrılar,
+        hangi worker'da olurlarsa olsunlar, tek bir sayfa isteğinin sonucunu
+        paylaşır. Pencere CHECK_INTERVAL_MIN'den çok kısa tutulur; böylece sık
+        kontrol edilen ürünlerin her kontrolü yeni bir istek yapar.
+
+        Args:
+            store_name: Mağaza adı
+            product_url: Ürün URL'i
+
+        Returns:
+            Stok durumu bilgisi
+        """
+        digest = hashlib.sha1(product_url.encode("utf-8")).hexdigest()
+
+        return await single_flight.do(
+            f"product:{digest}",
+            lambda: self._check_product_cached(store_name, product_url, f"product:{digest}"),
+            ttl=settings.PRODUCT_SHARE_TTL,
+            should_cache=lambda stock_info: "error" not in stock_info
+        )
+
+    async def check_products(self, products: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Birden fazla ürünü aynı loop'ta eşzamanlı kontrol eder
+
+        Celery görevleri ürün grubunu tek bir run() ile çalıştırır; böylece
+        MAX_CONCURRENT_CHECKS ve mağaza sınırları grup içindeki tüm
+        kontrollere birlikte uygulanır.
+
+        Args:
+            products: (store_name, product_url) listesi
+
+        Returns:
+            Girdi sırasıyla stok durumu listesi
+        """
+        results = await asyncio.gather(
+            *(self.check_product_shared(store_name, url) for store_name, url in products),
+            return_exceptions=True
+        )
+        stock_infos = []
+        for (store_name, url), result in zip(products, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error checking stock for {url}: {str(result)}")
+                result = {"is_in_stock": False, "error": str(result)}
+            stock_infos.append(result)
+        return stock_infos
+
+    async def scrape_wishlist(
+        self,
+        store_name: str,
+        wishlist_url: str,
+        cache_key: Optional[str] = None
+    ) -> Optional[Tuple[List[Dict], bool]]:
+        """
+        Wishlist'i eşzamanlılık sınırları içinde çeker
+
+        Args:
+            store_name: Mağaza adı
+            wishlist_url: Wishlist URL'i
+            cache_key: Verilirse sayfa değişmediğinde None döner (bkz. page_cache)
+
+        Returns:
+            (ürün listesi, sayfa tamamen yüklendi mi), sayfa değişmediyse None
+
+        Raises:
+            ScrapeError: Wishlist çekilemezse
+        """
+        return await self._limited(
+            store_name,
+            scraper_service.scrape_wishlist(store_name, wishlist_url, cache_key)
+        )
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """Coroutine'i senkron koddan (Celery görevleri) çalıştır"""
+        return asyncio.run(coro)
+
+
+# Global stock checker instance
+stock_checker = StockChecker()
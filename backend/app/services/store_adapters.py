@@ -0,0 +1,224 @@
+"""
+Mağaza adaptörleri - SUPPORTED_STORES tanımlarından derlenen ortak ayrıştırma motoru
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import soupsieve
+from bs4 import BeautifulSoup, Tag
+
+from app.core.config import settings
+
+# Bu alanlar sayfadaki göreli URL'lerden mutlak URL'e çevrilir
+URL_FIELDS = ("product_url", "product_image")
+
+# Ürün adı bulunamayan kartlar atlanır
+REQUIRED_FIELDS = ("product_name",)
+
+
+def _compile_field(spec: str) -> Tuple[Optional[Any], Optional[str]]:
+    """
+    Alan tanımını derler
+
+    "seçici" elemanın metnini, "seçici@attr" elemanın niteliğini,
+    "@attr" ise kartın kendi niteliğini okur.
+    """
+    selector, _, attr = spec.partition("@")
+    compiled = soupsieve.compile(selector) if selector else None
+    return compiled, attr or None
+
+
+def _extract_json_ld(soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    """Sayfaya gömülü JSON-LD bloklarını düz bir nesne listesine çevir"""
+    nodes = []
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+
+        stack = data if isinstance(data, list) else [data]
+        while stack:
+            node = stack.pop(0)
+            if not isinstance(node, dict):
+                continue
+            nodes.append(node)
+            stack.extend(node.get("@graph", []))
+            for element in node.get("itemListElement", []):
+                if isinstance(element, dict):
+                    stack.append(element.get("item", element))
+    return nodes
+
+
+def _json_ld_in_stock(node: Dict[str, Any]) -> bool:
+    """JSON-LD Product düğümünün stok durumunu oku"""
+    offers = node.get("offers") or {}
+    if isinstance(offers, dict):
+        offers = [offers]
+    return any(
+        "instock" in str(offer.get("availability", "")).lower()
+        for offer in offers if isinstance(offer, dict)
+    )
+
+
+def _json_ld_price(node: Dict[str, Any]) -> Optional[str]:
+    """JSON-LD Product düğümünün fiyatını oku"""
+    offers = node.get("offers") or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    price = offers.get("price") if isinstance(offers, dict) else None
+    return str(price) if price is not None else None
+
+
+class StoreAdapter:
+    """
+    Tek bir mağazanın derlenmiş seçicileri, alan çıkarıcıları ve stok kuralları
+
+    Yeni bir mağaza eklemek için SUPPORTED_STORES'a tanım eklemek yeterlidir.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.base_url = config["base_url"]
+        self.requires_render = config.get("requires_render", False)
+        # Tarayıcıda render beklenirken kullanılan ham seçiciler
+        self.wishlist_ready_selector = config["product_selector"]
+        self.product_ready_selector = config["stock_selector"]
+        self.product_selector = soupsieve.compile(config["product_selector"])
+        self.stock_selector = soupsieve.compile(config["stock_selector"])
+        self.size_selector = soupsieve.compile(config["size_selector"])
+        self.price_selector = soupsieve.compile(config["price_selector"])
+        self.disabled_class = config.get("disabled_class", "disabled")
+        self.in_stock_keywords = tuple(k.lower() for k in config["in_stock_keywords"])
+        self.out_of_stock_keywords = tuple(k.lower() for k in config.get("out_of_stock_keywords", []))
+        self.fields = {
+            field: _compile_field(spec)
+            for field, spec in config["fields"].items()
+        }
+
+    def _is_in_stock(self, elem: Optional[Tag]) -> bool:
+        """Stok elemanının metnini stok kurallarına göre değerlendir"""
+        if elem is None:
+            return False
+        text = elem.get_text().lower()
+        if any(keyword in text for keyword in self.out_of_stock_keywords):
+            return False
+        return any(keyword in text for keyword in self.in_stock_keywords)
+
+    def _extract_field(self, card: Tag, field: str) -> str:
+        """Karttan tek bir alanı oku"""
+        selector, attr = self.fields[field]
+        elem = selector.select_one(card) if selector else card
+        if elem is None:
+            return ""
+        value = elem.get(attr, "") if attr else elem.get_text(strip=True)
+        if field in URL_FIELDS and value:
+            value = urljoin(self.base_url, value)
+        return value
+
+    def parse_wishlist(self, html: str) -> Optional[List[Dict]]:
+        """
+        Wishlist sayfasındaki ürünleri tek geçişte çıkarır
+
+        Returns:
+            Ürün listesi, sayfada ürün verisi yoksa (render gerekiyorsa) None
+        """
+        soup = BeautifulSoup(html, "lxml")
+        products = []
+
+        for card in self.product_selector.select(soup):
+            product = {
+                "product_id": "",
+                "product_name": "",
+                "product_url": "",
+                "product_image": "",
+                "price": "",
+                "size": "",
+                "color": "",
+            }
+            for field in self.fields:
+                product[field] = self._extract_field(card, field)
+            if not all(product[field] for field in REQUIRED_FIELDS):
+                continue
+            product["is_in_stock"] = self._is_in_stock(self.stock_selector.select_one(card))
+            products.append(product)
+
+        if products:
+            return products
+
+        # Kart bulunamadıysa gömülü JSON verisine bak
+        for node in _extract_json_ld(soup):
+            if node.get("@type") != "Product":
+                continue
+            image = node.get("image") or ""
+            products.append({
+                "product_id": str(node.get("sku") or node.get("productID") or ""),
+                "product_name": node.get("name", ""),
+                "product_url": urljoin(self.base_url, node["url"]) if node.get("url") else "",
+                "product_image": image[0] if isinstance(image, list) and image else image,
+                "price": _json_ld_price(node) or "",
+                "size": "",
+                "color": "",
+                "is_in_stock": _json_ld_in_stock(node)
+            })
+
+        return products or None
+
+    def parse_product(self, html: str) -> Optional[Dict]:
+        """
+        Ürün sayfasından stok bilgisini çıkarır
+
+        Returns:
+            Stok durumu bilgisi, sayfada stok verisi yoksa (render gerekiyorsa) None
+        """
+        soup = BeautifulSoup(html, "lxml")
+
+        sizes = [
+            size_elem.get_text(strip=True)
+            for size_elem in self.size_selector.select(soup)
+            if self.disabled_class not in size_elem.get("class", [])
+        ]
+        price_elem = self.price_selector.select_one(soup)
+        stock_elem = self.stock_selector.select_one(soup)
+
+        if stock_elem is not None:
+            return {
+                "is_in_stock": self._is_in_stock(stock_elem),
+                "available_sizes": sizes,
+                "available_colors": [],
+                "price": price_elem.get_text(strip=True) if price_elem else None,
+                "last_checked": None
+            }
+
+        for node in _extract_json_ld(soup):
+            if node.get("@type") == "Product":
+                return {
+                    "is_in_stock": _json_ld_in_stock(node),
+                    "available_sizes": sizes,
+                    "available_colors": [],
+                    "price": _json_ld_price(node),
+                    "last_checked": None
+                }
+
+        return None
+
+
+# Seçiciler süreç başına bir kez, modül yüklenirken derlenir
+STORE_ADAPTERS: Dict[str, StoreAdapter] = {
+    store_name: StoreAdapter(store_name, store_config)
+    for store_name, store_config in settings.SUPPORTED_STORES.items()
+}
+
+
+def get_store_adapter(store_name: str) -> Optional[StoreAdapter]:
+    """
+    Mağaza adaptörünü döndürür
+
+    Args:
+        store_name: Mağaza adı
+
+    Returns:
+        StoreAdapter, mağaza desteklenmiyorsa None
+    """
+    return STORE_ADAPTERS.get(store_name)
@@ -0,0 +1,136 @@
+"""
+Bildirim alıcı indeksi - Wishlist'ten kullanıcı cihaz token'larına önbellekli eşleme
+"""
+import json
+from typing import Dict, Iterable, List, Optional
+
+import redis
+from loguru import logger
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis_client import redis_client
+from app.models.user import User
+from app.models.wishlist import Wishlist
+
+# Tek sorguda aranan/temizlenen en fazla token sayısı
+PRUNE_CHUNK_SIZE = 500
+
+
+class TokenIndex:
+    """
+    Wishlist id'sinden alıcı FCM token'larına Redis önbellekli indeks
+
+    Kullanıcıya bağlı olmayan wishlist'ler için None döner (topic'e gönderilir);
+    kullanıcısı olup kayıtlı cihazı olmayanlar için boş liste döner. Token veya
+    wishlist sahibi değiştiğinde ilgili kayıtlar invalidate ile silinir.
+    """
+
+    def __init__(self, client: redis.Redis = redis_client):
+        self.client = client
+
+    def _key(self, wishlist_id: int) -> str:
+        return f"notify:tokens:{wishlist_id}"
+
+    def tokens_for(self, db: Session, wishlist_ids: Iterable[int]) -> Dict[int, Optional[List[str]]]:
+        """
+        Wishlist'lerin alıcı token'larını getirir
+
+        Args:
+            db: Veritabanı session'ı
+            wishlist_ids: Wishlist id'leri
+
+        Returns:
+            Wishlist id'si → token listesi (kullanıcısız wishlist'lerde None)
+        """
+        wishlist_ids = list(dict.fromkeys(wishlist_ids))
+        tokens: Dict[int, Optional[List[str]]] = {}
+        if not wishlist_ids:
+            return tokens
+
+        try:
+            cached = self.client.mget([self._key(wishlist_id) for wishlist_id in wishlist_ids])
+        except redis.RedisError as e:
+            logger.warning(f"Token index unavailable: {str(e)}")
+            cached = [None] * len(wishlist_ids)
+
+        missing = []
+        for wishlist_id, value in zip(wishlist_ids, cached):
+            if value is None:
+                missing.append(wishlist_id)
+            else:
+                tokens[wishlist_id] = json.loads(value)
+        if not missing:
+            return tokens
+
+        # Önbellekte olmayanlar tek sorguda yüklenir
+        rows = db.execute(
+            select(Wishlist.id, Wishlist.user_id, User.fcm_token)
+            .outerjoin(User, and_(User.id == Wishlist.user_id, User.is_active == True))
+            .where(Wishlist.id.in_(missing))
+        ).all()
+        loaded = {}
+        for wishlist_id, user_id, fcm_token in rows:
+            if user_id is None:
+                loaded[wishlist_id] = None
+            else:
+                loaded[wishlist_id] = [fcm_token] if fcm_token else []
+        tokens.update(loaded)
+
+        try:
+            pipe = self.client.pipeline()
+            for wishlist_id, value in loaded.items():
+                pipe.set(self._key(wishlist_id), json.dumps(value), ex=settings.TOKEN_INDEX_TTL)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Could not cache wishlist tokens: {str(e)}")
+        return tokens
+
+    def invalidate(self, wishlist_ids: Iterable[int]):
+        """Wishlist'lerin önbellekteki token'larını sil"""
+        keys = [self._key(wishlist_id) for wishlist_id in wishlist_ids]
+        if not keys:
+            return
+        try:
+            self.client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Could not invalidate token index: {str(e)}")
+
+    def prune(self, db: Session, invalid_tokens: Iterable[str]) -> int:
+        """
+        FCM'in geçersiz bildirdiği token'ları kullanıcılardan toplu olarak siler
+
+        Args:
+            db: Veritabanı session'ı
+            invalid_tokens: Geçersiz token'lar
+
+        Returns:
+            Token'ı silinen kullanıcı sayısı
+        """
+        invalid_tokens = list(dict.fromkeys(invalid_tokens))
+        pruned = 0
+        affected = []
+        for start in range(0, len(invalid_tokens), PRUNE_CHUNK_SIZE):
+            chunk = invalid_tokens[start:start + PRUNE_CHUNK_SIZE]
+            affected.extend(db.execute(
+                select(Wishlist.id)
+                .join(User, User.id == Wishlist.user_id)
+                .where(User.fcm_token.in_(chunk))
+            ).scalars())
+            pruned += db.execute(
+                update(User)
+                .where(User.fcm_token.in_(chunk))
+                .values(fcm_token=None)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        db.commit()
+
+        self.invalidate(affected)
+        if pruned:
+            logger.info(f"Pruned {pruned} invalid FCM tokens")
+        return pruned
+
+
+# Global token index instance
+token_index = TokenIndex()
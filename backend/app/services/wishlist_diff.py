@@ -0,0 +1,81 @@
+"""
+Wishlist fark motoru - Scrape edilen ürünleri veritabanındakilerle karşılaştırır
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+# Ürünün değişip değişmediğine karar verilen alanlar
+DIFF_FIELDS = (
+    "product_name",
+    "product_url",
+    "product_image",
+    "price",
+    "size",
+    "color",
+    "is_in_stock",
+)
+
+
+def item_hash(values: Mapping[str, Any]) -> str:
+    """Ürün alanlarının karşılaştırma hash'i (None ve "" aynı sayılır)"""
+    normalized = [values.get(field) or "" for field in DIFF_FIELDS]
+    normalized[-1] = bool(values.get("is_in_stock"))
+    return hashlib.sha1(json.dumps(normalized).encode("utf-8")).hexdigest()
+
+
+class WishlistDiff:
+    """Scrape edilen ve saklanan ürün kümeleri arasındaki fark"""
+
+    def __init__(self):
+        self.added: List[Dict] = []
+        self.removed: List[Any] = []
+        self.changed: List[Tuple[Any, Dict]] = []
+        self.unchanged: List[Any] = []
+        self.restocked: List[Dict] = []
+
+    def __repr__(self):
+        return (
+            f"<WishlistDiff(added={len(self.added)}, removed={len(self.removed)}, "
+            f"changed={len(self.changed)}, unchanged={len(self.unchanged)}, "
+            f"restocked={len(self.restocked)})>"
+        )
+
+
+def diff_wishlist(stored: Iterable[Any], scraped: List[Dict], detect_removed: bool = True) -> WishlistDiff:
+    """
+    Saklanan ürünleri scrape sonucuyla product_id üzerinden karşılaştırır
+
+    Args:
+        stored: Veritabanındaki satırlar (id, product_id ve DIFF_FIELDS alanları)
+        scraped: Scraper'dan gelen ürün listesi
+        detect_removed: Scrape sonucunda olmayan satırlar silinmiş sayılsın mı
+
+    Returns:
+        Eklenen, silinen, değişen ve değişmeyen ürünler ile stoğa girenler
+    """
+    diff = WishlistDiff()
+    stored_by_id = {row.product_id: row for row in stored}
+    scraped_by_id = {product["product_id"]: product for product in scraped}
+
+    for product_id, product in scraped_by_id.items():
+        row = stored_by_id.get(product_id)
+        if row is None:
+            diff.added.append(product)
+            continue
+
+        if item_hash({field: getattr(row, field) for field in DIFF_FIELDS}) == item_hash(product):
+            diff.unchanged.append(row)
+            continue
+
+        diff.changed.append((row, product))
+        if not row.is_in_stock and product["is_in_stock"]:
+            diff.restocked.append(product)
+
+    if detect_removed:
+        diff.removed = [
+            row for product_id, row in stored_by_id.items()
+            if product_id not in scraped_by_id
+        ]
+
+    return diff
@@ -2,6 +2,8 @@
 Celery uygulama konfigürasyonu
 """
 from celery import Celery
+from celery.signals import worker_process_shutdown
+from kombu import Exchange, Queue
 from app.core.config import settings
 
 # Celery uygulamasını oluştur
@@ -24,16 +26,63 @@ celery_app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 dakika
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # Countdown'lı görevler döngü boyunca bekler; görünürlük süresi dolup
+    # tekrar teslim edilmemeleri için döngüden uzun tutulur
+    broker_transport_options={
+        "visibility_timeout": max(3600, settings.WISHLIST_SYNC_INTERVAL * 60 * 2),
+        # Redis'te kuyruk içi öncelik: 0 en yüksek, 9 en düşük
+        "priority_steps": list(range(10)),
+        # Birden fazla kuyruk dinleyen worker, -Q sırasına göre önceliklendirir
+        "queue_order_strategy": "priority",
+    },
+    # Kuyruklar; her biri ayrı worker ile tüketilir (bkz. KURULUM.md)
+    task_queues=(
+        Queue("interactive", Exchange("interactive"), routing_key="interactive"),  # kullanıcının başlattığı yenilemeler
+        Queue("scrape", Exchange("scrape"), routing_key="scrape"),  # zamanlanmış, tarayıcı kullanan kontroller
+        Queue("notify", Exchange("notify"), routing_key="notify"),  # stok bildirimleri
+        Queue("maintenance", Exchange("maintenance"), routing_key="maintenance"),  # beat görevleri, temizlik ve flush işleri
+    ),
+    task_default_queue="scrape",
+    task_default_priority=5,
+    task_routes={
+        "app.tasks.stock_tasks.dispatch_notifications": {"queue": "notify", "priority": 0},
+        "app.tasks.stock_tasks.check_wishlist_stock": {"queue": "scrape"},
+        "app.tasks.stock_tasks.check_single_product_stock": {"queue": "scrape"},
+        "app.tasks.stock_tasks.check_product_batch": {"queue": "scrape"},
+        "app.tasks.stock_tasks.check_all_wishlists": {"queue": "maintenance"},
+        "app.tasks.stock_tasks.dispatch_due_items": {"queue": "maintenance"},
+        "app.tasks.stock_tasks.flush_heartbeats": {"queue": "maintenance"},
+        "app.tasks.stock_tasks.cleanup_old_notifications": {"queue": "maintenance", "priority": 9},
+    },
 )
 
 # Periyodik görevler
 celery_app.conf.beat_schedule = {
     "check-all-wishlists": {
         "task": "app.tasks.stock_tasks.check_all_wishlists",
-        "schedule": settings.STOCK_CHECK_INTERVAL * 60,  # dakikayı saniyeye çevir
+        "schedule": settings.WISHLIST_SYNC_INTERVAL * 60,  # dakikayı saniyeye çevir
+    },
+    "dispatch-due-items": {
+        "task": "app.tasks.stock_tasks.dispatch_due_items",
+        "schedule": 60,  # zamanı gelen ürün kontrolleri dakikada bir kuyruğa alınır
+    },
+    "dispatch-notifications": {
+        "task": "app.tasks.stock_tasks.dispatch_notifications",
+        "schedule": settings.NOTIFICATION_DISPATCH_INTERVAL,  # kaçırılan ve tekrar denenecek bildirimler
+    },
+    "flush-heartbeats": {
+        "task": "app.tasks.stock_tasks.flush_heartbeats",
+        "schedule": settings.HEARTBEAT_FLUSH_INTERVAL,
     },
     "cleanup-old-notifications": {
         "task": "app.tasks.stock_tasks.cleanup_old_notifications",
         "schedule": 24 * 60 * 60,  # 24 saat
     },
-} 
\ No newline at end of file
+}
+
+
+@worker_process_shutdown.connect
+def close_browser_pool(**kwargs):
+    """Worker süreci kapanırken havuzdaki tarayıcıları kapat"""
+    from app.services.browser_pool import browser_pool
+    browser_pool.close()
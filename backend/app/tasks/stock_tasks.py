@@ -1,35 +1,153 @@
 """
 Stok kontrolü Celery görevleri
 """
-from datetime import datetime, timedelta
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from typing import List, Dict
+import redis
+from celery import group
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.orm import Session
 from loguru import logger
 
 from app.tasks.celery_app import celery_app
+from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.redis_client import redis_client
 from app.models.wishlist import Wishlist, WishlistItem
 from app.models.notification import Notification
-from app.services.scraper_service import scraper_service
+from app.services.check_scheduler import check_scheduler, next_interval
+from app.services.heartbeat_buffer import heartbeat_buffer
+from app.services.lease_lock import wishlist_lock, wishlist_write_lock
+from app.services.page_cache import page_cache
+from app.services.scraper_service import ScrapeError
+from app.services.stock_checker import stock_checker
+from app.services.token_index import token_index
+from app.services.wishlist_diff import DIFF_FIELDS, diff_wishlist
+from app.services.notification_cooldown import notification_cooldown
+from app.services.notification_outbox import notification_outbox
 from app.services.notification_service import notification_service
 
+# Scraper'dan gelip wishlist_items tablosuna yazılan alanlar
+ITEM_FIELDS = (
+    "product_id",
+    "product_name",
+    "product_url",
+    "product_image",
+    "price",
+    "size",
+    "color",
+    "is_in_stock",
+)
+
+
+def record_heartbeats(db: Session, item_ids: List[int]):
+    """
+    Değişmeyen ürünlerin kontrol zamanını kaydeder
+
+    Zamanlar heartbeat tamponuna yazılır ve flush_heartbeats ile toplu olarak
+    veritabanına aktarılır. Redis'e ulaşılamazsa doğrudan yazılır.
+    """
+    if not item_ids or heartbeat_buffer.record(item_ids):
+        return
+    
+    try:
+        db.execute(
+            update(WishlistItem).where(WishlistItem.id.in_(item_ids)),
+            {"last_checked": datetime.utcnow()}
+        )
+        db.commit()
+    except Exception as e:
+        logger.error(f"Error saving last_checked for {len(item_ids)} items: {str(e)}")
+        db.rollback()
+
+
+def schedule_dispatch(deadline: datetime):
+    """
+    Bildirim dispatcher'ını wishlist'in birleştirme penceresi kapanınca çalıştırır
+
+    Pencere içinde oluşan bildirimler aynı çalıştırmada toplanır ve wishlist
+    başına tek bir özet push olarak gönderilir. Aynı saniyede kapanan
+    pencereler tek çalıştırmayı paylaşır.
+
+    Args:
+        deadline: Pencerenin kapandığı zaman (UTC, bkz. notification_outbox.window_deadline)
+    """
+    eta = math.ceil(deadline.replace(tzinfo=timezone.utc).timestamp())
+    try:
+        if not redis_client.set(
+            f"notify:dispatch-scheduled:{eta}", 1, nx=True, ex=settings.NOTIFICATION_COALESCE_WINDOW * 2
+        ):
+            return
+    except redis.RedisError as e:
+        logger.warning(f"Could not coalesce notification dispatch: {str(e)}")
+    dispatch_notifications.apply_async(eta=datetime.fromtimestamp(eta, timezone.utc))
+
+
+def report_progress(task, **meta):
+    """Görevin ilerlemesini sonuç backend'ine yazar (doğrudan çağrılarda yok sayılır)"""
+    if not task.request.id:
+        return
+    try:
+        task.update_state(state="PROGRESS", meta=meta)
+    except Exception as e:
+        logger.warning(f"Could not report progress for {task.request.id}: {str(e)}")
+
 
 @celery_app.task
 def check_all_wishlists():
-    """Tüm aktif wishlist'leri kontrol eder"""
-    logger.info("Starting stock check for all wishlists")
+    """
+    Tüm aktif wishlist'leri eklenen ve silinen ürünler için tarar
+
+    Ürünlerin stok kontrolleri check_scheduler üzerinden ürün bazında yapılır;
+    bu tarama yalnızca wishlist içeriğini senkronlar ve yeni ürünleri
+    zamanlayıcıya ekler. Taramalar aynı anda değil, WISHLIST_SYNC_INTERVAL
+    boyunca eşit aralıklarla (küçük sapmalarla) çalışacak şekilde countdown
+    ile kuyruğa alınır.
+    """
+    logger.info("Starting sync for all wishlists")
     
+    window = settings.WISHLIST_SYNC_INTERVAL * 60
+    chunk_size = settings.DISPATCH_CHUNK_SIZE
     db = SessionLocal()
     try:
-        # Aktif wishlist'leri al
-        active_wishlists = db.query(Wishlist).filter(Wishlist.is_active == True).all()
-        
-        for wishlist in active_wishlists:
-            try:
-                check_wishlist_stock.delay(wishlist.id)
-                logger.info(f"Scheduled stock check for wishlist: {wishlist.name}")
-            except Exception as e:
-                logger.error(f"Error scheduling stock check for wishlist {wishlist.id}: {str(e)}")
+        active = Wishlist.is_active == True
+        total = db.query(func.count(Wishlist.id)).filter(active).scalar()
+        if not total:
+            return
+        
+        # Her wishlist kendi zaman diliminde rastgele bir anda çalışır
+        spacing = window / total
+        wishlist_ids = db.execute(
+            select(Wishlist.id).where(active).order_by(Wishlist.id)
+            .execution_options(yield_per=chunk_size)
+        ).scalars()
+        
+        batch = []
+        for index, wishlist_id in enumerate(wishlist_ids):
+            countdown = index * spacing + random.uniform(0, spacing)
+            batch.append(check_wishlist_stock.signature((wishlist_id,), countdown=countdown))
+            if len(batch) >= chunk_size:
+                group(batch).apply_async()
+                batch = []
+        if batch:
+            group(batch).apply_async()
+        logger.info(f"Scheduled syncs for {total} wishlists over {window} seconds")
+        
+        # Zamanlayıcıda olmayan (yeni eklenen) ürünleri kontrol kuyruğuna ekle
+        item_ids = db.execute(
+            select(WishlistItem.id).join(Wishlist).where(active)
+            .execution_options(yield_per=chunk_size)
+        ).scalars()
+        seeded = sum(
+            check_scheduler.seed(chunk)
+            for chunk in iter(lambda: list(islice(item_ids, chunk_size)), [])
+        )
+        if seeded:
+            logger.info(f"Scheduled {seeded} new items for adaptive stock checks")
                 
     except Exception as e:
         logger.error(f"Error in check_all_wishlists: {str(e)}")
@@ -38,118 +156,251 @@ def check_all_wishlists():
 
 
 @celery_app.task
-def check_wishlist_stock(wishlist_id: int):
-    """Belirli bir wishlist'in stok durumunu kontrol eder"""
+def dispatch_due_items():
+    """Kontrol zamanı gelen ürünleri kuyruğa alır"""
+    db = SessionLocal()
+    try:
+        item_ids = check_scheduler.claim_due()
+        if not item_ids:
+            return
+        
+        rows = db.query(
+            WishlistItem.id, WishlistItem.product_url, Wishlist.store_name
+        ).join(Wishlist).filter(
+            WishlistItem.id.in_(item_ids),
+            Wishlist.is_active == True
+        ).all()
+        
+        # Aynı mağazanın ürünleri gruplanır; her grup tek loop'ta eşzamanlı kontrol edilir
+        rows.sort(key=lambda row: row.store_name)
+        batch_size = settings.CHECK_BATCH_SIZE
+        for start in range(0, len(rows), batch_size):
+            check_product_batch.delay([
+                (row.product_url, row.store_name, row.id)
+                for row in rows[start:start + batch_size]
+            ])
+        
+        # Silinen veya pasif wishlist'lerdeki ürünler kuyruktan çıkarılır
+        found = {row.id for row in rows}
+        check_scheduler.remove(item_id for item_id in item_ids if item_id not in found)
+        logger.info(f"Dispatched {len(rows)} due product checks")
+        
+    except Exception as e:
+        logger.error(f"Error dispatching due product checks: {str(e)}")
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True)
+def check_wishlist_stock(self, wishlist_id: int):
+    """
+    Belirli bir wishlist'in stok durumunu kontrol eder
+
+    Aynı wishlist için aynı anda yalnızca bir kontrol çalışır; kilit başka
+    bir görevdeyse bu çalıştırma atlanır. Mevcut ürünler yazma kilidi altında
+    okunup yazılır, böylece ürün bazlı kontrollerle aynı stok geçişi iki kez
+    işlenmez. İlerleme PROGRESS durumuyla raporlanır ve sonuç ürün sayılarını
+    içerir (bkz. /api/v1/jobs).
+    """
     logger.info(f"Checking stock for wishlist ID: {wishlist_id}")
     
+    job_id = self.request.id or uuid.uuid4().hex
+    acquired, holder = wishlist_lock.acquire(str(wishlist_id), job_id, settings.WISHLIST_LOCK_TTL)
+    if not acquired:
+        logger.info(f"Stock check for wishlist {wishlist_id} already running as {holder}, skipping")
+        return {"wishlist_id": wishlist_id, "stage": "skipped", "running_job_id": holder}
+    
     db = SessionLocal()
     try:
         wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_id).first()
         if not wishlist:
             logger.error(f"Wishlist not found: {wishlist_id}")
-            return
+            return {"wishlist_id": wishlist_id, "stage": "failed", "error": "Wishlist not found"}
         
         # Wishlist'ten ürünleri çek
-        products = scraper_service.scrape_wishlist(wishlist.store_name, str(wishlist.url))
-        
-        for product_data in products:
-            try:
-                # Ürünü veritabanında güncelle veya oluştur
-                wishlist_item = db.query(WishlistItem).filter(
-                    WishlistItem.wishlist_id == wishlist_id,
-                    WishlistItem.product_id == product_data["product_id"]
-                ).first()
-                
-                if wishlist_item:
-                    # Mevcut ürünü güncelle
-                    wishlist_item.product_name = product_data["product_name"]
-                    wishlist_item.product_url = product_data["product_url"]
-                    wishlist_item.product_image = product_data["product_image"]
-                    wishlist_item.price = product_data["price"]
-                    wishlist_item.size = product_data["size"]
-                    wishlist_item.color = product_data["color"]
-                    wishlist_item.last_checked = datetime.utcnow()
-                    
-                    # Stok durumu değişti mi kontrol et
-                    old_stock_status = wishlist_item.is_in_stock
-                    wishlist_item.is_in_stock = product_data["is_in_stock"]
-                    
-                    # Stok geldiyse bildirim gönder
-                    if not old_stock_status and wishlist_item.is_in_stock:
-                        send_stock_notification.delay(
-                            wishlist_id=wishlist_id,
-                            product_id=product_data["product_id"],
-                            product_name=product_data["product_name"],
-                            wishlist_name=wishlist.name
-                        )
-                        
-                else:
-                    # Yeni ürün ekle
-                    wishlist_item = WishlistItem(
-                        wishlist_id=wishlist_id,
-                        product_id=product_data["product_id"],
-                        product_name=product_data["product_name"],
-                        product_url=product_data["product_url"],
-                        product_image=product_data["product_image"],
-                        price=product_data["price"],
-                        size=product_data["size"],
-                        color=product_data["color"],
-                        is_in_stock=product_data["is_in_stock"],
-                        last_checked=datetime.utcnow()
-                    )
-                    db.add(wishlist_item)
-                
-                db.commit()
-                logger.info(f"Updated product: {product_data['product_name']} in wishlist: {wishlist.name}")
-                
-            except Exception as e:
-                logger.error(f"Error processing product in wishlist {wishlist_id}: {str(e)}")
-                db.rollback()
+        report_progress(self, wishlist_id=wishlist_id, stage="scraping")
+        cache_key = f"wishlist:{wishlist_id}"
+        try:
+            scraped = stock_checker.run(
+                stock_checker.scrape_wishlist(wishlist.store_name, str(wishlist.url), cache_key=cache_key)
+            )
+        except ScrapeError as e:
+            # Başarısız tarama boş wishlist gibi kaydedilmez, iş hata ile biter
+            return {"wishlist_id": wishlist_id, "stage": "failed", "error": str(e)}
+        if scraped is None:
+            # Sayfa son kontrolden beri değişmedi, yalnızca kontrol zamanı kaydedilir
+            item_ids = [
+                item_id for item_id, in
+                db.query(WishlistItem.id).filter(WishlistItem.wishlist_id == wishlist_id)
+            ]
+            record_heartbeats(db, item_ids)
+            return {"wishlist_id": wishlist_id, "stage": "done", "counts": {"unchanged": len(item_ids)}}
+        
+        products, complete = scraped
+        report_progress(self, wishlist_id=wishlist_id, stage="saving", counts={"scraped": len(products)})
+        
+        # Ürün bazlı yazmalar kısa sürer; bitmelerini bekle
+        if not wishlist_write_lock.wait(
+            str(wishlist_id), job_id, settings.WISHLIST_WRITE_LOCK_TTL, settings.WISHLIST_WRITE_LOCK_TTL
+        ):
+            return {"wishlist_id": wishlist_id, "stage": "failed", "error": "Timed out waiting for item writes"}
+        
+        # Mevcut ürünleri tek sorguda yükle ve scrape sonucuyla karşılaştır.
+        # Yarım yüklenen sayfada veya boş sonuçta (engelleme olabilir) ürünler
+        # eksik gelebileceği için silme tespiti yapılmaz.
+        stored = db.query(
+            WishlistItem.id,
+            WishlistItem.product_id,
+            WishlistItem.stock_change_count,
+            WishlistItem.last_stock_change_at,
+            *[getattr(WishlistItem, field) for field in DIFF_FIELDS]
+        ).filter(WishlistItem.wishlist_id == wishlist_id).all()
+        diff = diff_wishlist(stored, products, detect_removed=complete and bool(products))
+        
+        # Yalnızca eklenen, değişen ve silinen satırlar yazılır
+        now = datetime.utcnow()
+        inserts = [
+            {"wishlist_id": wishlist_id, "last_checked": now,
+             **{field: product_data[field] for field in ITEM_FIELDS}}
+            for product_data in diff.added
+        ]
+        updates = []
+        for row, product_data in diff.changed:
+            # Stok geçişleri uyarlamalı zamanlama için sayılır
+            flipped = bool(row.is_in_stock) != bool(product_data["is_in_stock"])
+            updates.append({
+                "id": row.id,
+                "last_checked": now,
+                "stock_change_count": (row.stock_change_count or 0) + flipped,
+                "last_stock_change_at": now if flipped else row.last_stock_change_at,
+                **{field: product_data[field] for field in ITEM_FIELDS}
+            })
+        removed_ids = [row.id for row in diff.removed]
+        
+        # Bekleme süresindeki ürünler için tekrar bildirim üretilmez
+        alert_deadline = None
+        alert_ids = notification_cooldown.acquire(
+            wishlist_id, [product_data["product_id"] for product_data in diff.restocked]
+        )
+        
+        # Tek transaction'da toplu yaz
+        try:
+            if inserts:
+                db.execute(insert(WishlistItem), inserts)
+            if updates:
+                db.execute(update(WishlistItem), updates)
+            if removed_ids:
+                db.execute(delete(WishlistItem).where(WishlistItem.id.in_(removed_ids)))
+            # Bildirimler stok değişimiyle aynı commit'te outbox'a yazılır
+            for product_data in diff.restocked:
+                if product_data["product_id"] not in alert_ids:
+                    continue
+                alert_deadline = notification_outbox.add_stock_alert(
+                    db,
+                    wishlist_id=wishlist_id,
+                    wishlist_name=wishlist.name,
+                    product_id=product_data["product_id"],
+                    product_name=product_data["product_name"]
+                ).next_attempt_at
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error saving products for wishlist {wishlist_id}: {str(e)}")
+            db.rollback()
+            notification_cooldown.release(wishlist_id, alert_ids)
+            return {"wishlist_id": wishlist_id, "stage": "failed", "error": str(e)}
+        
+        logger.info(f"Updated wishlist {wishlist.name}: {diff}")
+        
+        # Değişmeyen ürünlerin kontrol zamanı tamponlanır
+        record_heartbeats(db, [row.id for row in diff.unchanged])
+        
+        # Sayfa tamamen işlendi, sonraki döngüde aynı içerik atlanabilir
+        page_cache.commit(cache_key)
+        
+        if diff.added:
+            # Yeni ürünler ürün bazlı kontrol kuyruğuna alınır
+            check_scheduler.seed(
+                item_id for item_id, in
+                db.query(WishlistItem.id).filter(WishlistItem.wishlist_id == wishlist_id)
+            )
+        
+        if alert_deadline:
+            schedule_dispatch(alert_deadline)
+        
+        return {
+            "wishlist_id": wishlist_id,
+            "stage": "done",
+            "counts": {
+                "added": len(diff.added),
+                "changed": len(diff.changed),
+                "removed": len(diff.removed),
+                "unchanged": len(diff.unchanged),
+            }
+        }
                 
     except Exception as e:
         logger.error(f"Error checking wishlist stock for {wishlist_id}: {str(e)}")
+        return {"wishlist_id": wishlist_id, "stage": "failed", "error": str(e)}
     finally:
         db.close()
+        wishlist_write_lock.release(str(wishlist_id), job_id)
+        wishlist_lock.release(str(wishlist_id), job_id)
 
 
 @celery_app.task
-def send_stock_notification(wishlist_id: int, product_id: str, product_name: str, wishlist_name: str):
-    """Stok bildirimi gönderir"""
-    logger.info(f"Sending stock notification for product: {product_name}")
-    
+def dispatch_notifications(max_batches: int = 10):
+    """
+    Outbox'taki bekleyen bildirimleri toplu olarak gönderir
+
+    Bildirimler NOTIFICATION_BATCH_SIZE'lık gruplar halinde kiralanır, wishlist
+    sahibinin cihazlarına tek send_batch çağrısıyla gönderilir ve sonuçlar toplu
+    işlenir. Geçici hatayla başarısız olanlar geri çekilme süresi sonunda tekrar
+    denenir; tüm token'ları kalıcı olarak reddedilenler bırakılır. FCM'in
+    geçersiz bildirdiği token'lar kullanıcılardan silinir.
+    """
     db = SessionLocal()
     try:
-        # Bildirim oluştur
-        notification = Notification(
-            wishlist_id=wishlist_id,
-            product_id=product_id,
-            title=f"Stok Geldi! - {wishlist_name}",
-            message=f"{product_name} ürünü stokta! Hemen satın alabilirsiniz.",
-            notification_type="stock_alert"
-        )
-        db.add(notification)
-        db.commit()
-        
-        # Push notification gönder
-        notification_service.send_push_notification(
-            title=notification.title,
-            message=notification.message,
-            data={
-                "wishlist_id": wishlist_id,
-                "product_id": product_id,
-                "notification_type": "stock_alert"
-            }
-        )
-        
-        # Bildirimi gönderildi olarak işaretle
-        notification.is_sent = True
-        notification.sent_at = datetime.utcnow()
-        db.commit()
-        
-        logger.info(f"Stock notification sent for product: {product_name}")
-        
+        for _ in range(max_batches):
+            notifications = notification_outbox.claim(db)
+            if not notifications:
+                break
+            
+            # Aynı wishlist'in bildirimleri tek özet push'ta gönderilir
+            messages = notification_outbox.coalesce(notifications)
+            recipients = token_index.tokens_for(db, [group[0].wishlist_id for _, group in messages])
+            
+            sent_ids = []
+            failures = {}
+            permanent = []
+            deliverable = []
+            for message, group in messages:
+                tokens = recipients.get(group[0].wishlist_id)
+                if tokens == []:
+                    # Kullanıcının kayıtlı cihazı yok; cihaz eklenirse sonraki denemede gider
+                    for notification in group:
+                        failures[notification.id] = "No registered device tokens"
+                    continue
+                message["fcm_tokens"] = tokens
+                deliverable.append((message, group))
+            
+            results = notification_service.send_batch([message for message, _ in deliverable])
+            for (_, group), result in zip(deliverable, results):
+                for notification in group:
+                    if result.success:
+                        sent_ids.append(notification.id)
+                        continue
+                    failures[notification.id] = result.error or "Unknown error"
+                    if not result.retryable:
+                        permanent.append(notification.id)
+            notification_outbox.complete(db, sent_ids, failures, permanent)
+            token_index.prune(db, [token for result in results for token in result.invalid_tokens])
+            logger.info(
+                f"Dispatched {len(notifications)} notifications in {len(deliverable)} pushes: "
+                f"{len(sent_ids)} sent, {len(failures)} failed ({len(permanent)} permanently)"
+            )
+            
     except Exception as e:
-        logger.error(f"Error sending stock notification: {str(e)}")
+        logger.error(f"Error dispatching notifications: {str(e)}")
         db.rollback()
     finally:
         db.close()
@@ -179,38 +430,145 @@ def cleanup_old_notifications():
 
 
 @celery_app.task
-def check_single_product_stock(product_url: str, store_name: str, wishlist_item_id: int):
-    """Tek bir ürünün stok durumunu kontrol eder"""
-    logger.info(f"Checking stock for single product: {product_url}")
-    
+def flush_heartbeats():
+    """Tamponlanan last_checked zamanlarını toplu olarak yazar"""
+    db = SessionLocal()
+    try:
+        flushed = heartbeat_buffer.flush(db)
+        if flushed:
+            logger.info(f"Flushed last_checked for {flushed} items")
+    except Exception as e:
+        logger.error(f"Error flushing heartbeats: {str(e)}")
+    finally:
+        db.close()
+
+
+def apply_product_result(job_id: str, store_name: str, wishlist_item_id: int, stock_info: Dict):
+    """
+    Ürün kontrolünün sonucunu yazar ve bir sonraki kontrolü planlar
+
+    Sonuç wishlist yazma kilidi alınarak yazılır; böylece aynı anda çalışan
+    bir wishlist kontrolüyle aynı stok geçişi iki kez işlenmez. Tam wishlist
+    kontrolünün kirası alınmaz, yenileme istekleri engellenmez.
+    """
     db = SessionLocal()
+    alert = None
+    locked_wishlist_id = None
     try:
-        # Ürün stok durumunu kontrol et
-        stock_info = scraper_service.check_product_stock(product_url, store_name)
+        wishlist_id = db.query(WishlistItem.wishlist_id).filter(WishlistItem.id == wishlist_item_id).scalar()
+        if wishlist_id is None:
+            return
         
-        # Wishlist item'ı güncelle
+        if "error" in stock_info:
+            # Başarısız kontrol stok değişimi sayılmaz, normal aralıkla tekrar denenir
+            check_scheduler.schedule(wishlist_item_id, settings.STOCK_CHECK_INTERVAL * 60)
+            return
+        
+        acquired, _ = wishlist_write_lock.acquire(str(wishlist_id), job_id, settings.WISHLIST_WRITE_LOCK_TTL)
+        if not acquired:
+            # Wishlist kontrolü sonuçlarını yazıyor ve bu ürünü de yazacak;
+            # yarışmamak için sonucu yazmadan kısa süre sonra tekrar dene
+            check_scheduler.schedule(wishlist_item_id, settings.CHECK_INTERVAL_MIN * 60)
+            return
+        locked_wishlist_id = wishlist_id
+        
+        # Kilit alındıktan sonra güncel durum okunur
         wishlist_item = db.query(WishlistItem).filter(WishlistItem.id == wishlist_item_id).first()
-        if wishlist_item:
-            old_stock_status = wishlist_item.is_in_stock
+        if not wishlist_item:
+            return
+        
+        old_stock_status = wishlist_item.is_in_stock
+        if old_stock_status == stock_info["is_in_stock"]:
+            # Durum değişmedi, yalnızca kontrol zamanı tamponlanır
+            record_heartbeats(db, [wishlist_item.id])
+        else:
+            now = datetime.utcnow()
             wishlist_item.is_in_stock = stock_info["is_in_stock"]
-            wishlist_item.last_checked = datetime.utcnow()
+            wishlist_item.last_checked = now
+            wishlist_item.stock_change_count = (wishlist_item.stock_change_count or 0) + 1
+            wishlist_item.last_stock_change_at = now
             
-            # Stok geldiyse bildirim gönder
-            if not old_stock_status and wishlist_item.is_in_stock:
+            # Stok geldiyse bildirim aynı commit'te outbox'a yazılır
+            if wishlist_item.is_in_stock:
                 wishlist = db.query(Wishlist).filter(Wishlist.id == wishlist_item.wishlist_id).first()
-                if wishlist:
-                    send_stock_notification.delay(
+                if wishlist and notification_cooldown.acquire(wishlist.id, [wishlist_item.product_id]):
+                    alert_deadline = notification_outbox.add_stock_alert(
+                        db,
                         wishlist_id=wishlist.id,
+                        wishlist_name=wishlist.name,
                         product_id=wishlist_item.product_id,
-                        product_name=wishlist_item.product_name,
-                        wishlist_name=wishlist.name
-                    )
+                        product_name=wishlist_item.product_name
+                    ).next_attempt_at
+                    alert = (wishlist.id, [wishlist_item.product_id])
             
             db.commit()
             logger.info(f"Updated stock status for product: {wishlist_item.product_name}")
+            if alert:
+                alert = None
+                schedule_dispatch(alert_deadline)
+        
+        # Bir sonraki kontrolü ürünün stok geçmişine göre planla
+        check_scheduler.schedule(
+            wishlist_item.id,
+            next_interval(
+                store_name,
+                wishlist_item.stock_change_count,
+                wishlist_item.last_stock_change_at,
+                wishlist_item.created_at
+            )
+        )
             
     except Exception as e:
-        logger.error(f"Error checking single product stock: {str(e)}")
+        logger.error(f"Error saving stock result for item {wishlist_item_id}: {str(e)}")
         db.rollback()
+        if alert:
+            notification_cooldown.release(*alert)
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+        if locked_wishlist_id is not None:
+            wishlist_write_lock.release(str(locked_wishlist_id), job_id)
+
+
+@celery_app.task(bind=True)
+def check_product_batch(self, items: List[List]):
+    """
+    Bir grup ürünün stok durumunu tek bir event loop'ta kontrol eder
+
+    Kontroller check_products ile eşzamanlı çalışır ve MAX_CONCURRENT_CHECKS
+    ile mağaza sınırlarını paylaşır. Sonuçlar ürün ürün yazılır.
+
+    Args:
+        items: (product_url, store_name, wishlist_item_id) listesi
+    """
+    logger.info(f"Checking stock for {len(items)} products")
+    
+    job_id = self.request.id or uuid.uuid4().hex
+    try:
+        stock_infos = stock_checker.run(
+            stock_checker.check_products([(store_name, url) for url, store_name, _ in items])
+        )
+    except Exception as e:
+        # Tamamlanmayan ürünler CHECK_CLAIM_TIMEOUT sonunda tekrar alınır
+        logger.error(f"Error checking product batch: {str(e)}")
+        return
+    
+    for (url, store_name, wishlist_item_id), stock_info in zip(items, stock_infos):
+        apply_product_result(job_id, store_name, wishlist_item_id, stock_info)
+
+
+@celery_app.task(bind=True)
+def check_single_product_stock(self, product_url: str, store_name: str, wishlist_item_id: int):
+    """Tek bir ürünün stok durumunu kontrol eder (bkz. apply_product_result)"""
+    logger.info(f"Checking stock for single product: {product_url}")
+    
+    job_id = self.request.id or uuid.uuid4().hex
+    try:
+        # Ürün stok durumunu kontrol et (aynı URL'i izleyen diğer ürünlerle paylaşılır)
+        stock_info = stock_checker.run(
+            stock_checker.check_product_shared(store_name, product_url)
+        )
+    except Exception as e:
+        logger.error(f"Error checking single product stock: {str(e)}")
+        return
+    
+    apply_product_result(job_id, store_name, wishlist_item_id, stock_info) 
\ No newline at end of file
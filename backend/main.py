@@ -6,9 +6,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api.routes import wishlist, products, notifications
+from app.core.database import engine, async_engine, Base
+from app.api.routes import wishlist, products, notifications, jobs, users
 from app.tasks.celery_app import celery_app
+from app.services.browser_pool import browser_pool
 
 
 @asynccontextmanager
@@ -26,7 +27,8 @@ async def lifespan(app: FastAPI):
     yield
     
     # Temizlik işlemleri
-    pass
+    browser_pool.close()
+    await async_engine.dispose()
 
 
 # FastAPI uygulamasını oluştur
@@ -50,6 +52,8 @@ app.add_middleware(
 app.include_router(wishlist.router, prefix="/api/v1/wishlists", tags=["wishlists"])
 app.include_router(products.router, prefix="/api/v1/products", tags=["products"])
 app.include_router(notifications.router, prefix="/api/v1/notifications", tags=["notifications"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["jobs"])
+app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 
 
 @app.get("/")